@@ -2,9 +2,12 @@ import traceback
 import discord
 import os
 import asyncio
+import signal
 from discord.ext import commands
 from dotenv import load_dotenv
-from datetime import datetime
+from utils.command_sync import get_sync_scheduler
+from utils.http_client import get_http_client
+from utils.logger import log
 
 # ──────────────────────────────────────────────
 # Load environment
@@ -17,12 +20,6 @@ intents = discord.Intents.all()
 client = commands.AutoShardedBot(command_prefix="hx!", shard_count=1, intents=intents)
 client.remove_command("help")
 
-# ──────────────────────────────────────────────
-# Logging helper
-def log(message: str):
-    time = datetime.now().strftime("%H:%M:%S")
-    print(f"[{time}] {message}")
-
 # ──────────────────────────────────────────────
 # Events
 @client.event
@@ -49,15 +46,26 @@ async def on_ready():
         log("Failed to set custom status")
         traceback.print_exc()
 
-    # Sync slash commands
+    # Sync slash commands (guild-scoped, each guild gets only its enabled commands)
     try:
-        synced = await client.tree.sync()
-        log(f"Slash commands synced: {len(synced)}")
+        queued = await get_sync_scheduler(client).sync_all()
+        log(f"Slash command sync queued for {queued} guilds")
     except Exception:
         log("Slash command sync failed")
         traceback.print_exc()
 
 
+@client.event
+async def on_guild_join(guild: discord.Guild):
+    # A rejoined guild lost its commands when the bot left; always re-register
+    get_sync_scheduler(client).schedule(guild.id, force=True)
+
+
+@client.event
+async def on_guild_remove(guild: discord.Guild):
+    get_sync_scheduler(client).forget(guild.id)
+
+
 
 # ──────────────────────────────────────────────
 # Cog loader
@@ -73,13 +81,27 @@ async def load_cogs():
 # ──────────────────────────────────────────────
 # Main entry
 async def main():
+    # Shared pooled HTTP session for API cogs, closed on shutdown
+    http_client = get_http_client(client)
     await load_cogs()
+    # SIGTERM cancels like Ctrl-C does, so the finally below still runs
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows
     log("Starting BugTracker...")
     try:
         await client.start(TOKEN)
-    except KeyboardInterrupt:
-        log("Shutdown requested.")
+    finally:
+        # Runs on cancellation too: unloads cogs so their stores flush
+        log("Shutting down...")
         await client.close()
+        await get_sync_scheduler(client).close()
+        await http_client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Ctrl-C or SIGTERM; main() has already closed the bot
+        log("Shutdown requested.")
@@ -0,0 +1,62 @@
+import asyncio
+import discord
+from discord.ext import commands
+from utils.booster_cooldown import SUPPORT_SERVER_ID, booster_registry
+
+# on_member_update only fires for cached members; reseed this often (seconds)
+# to pick up boosts that happened outside the cache
+RESEED_INTERVAL = 60 * 60
+
+
+class Boosters(commands.Cog):
+    """Keeps the booster registry in sync with the support server."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._reseed_task = None
+
+    async def cog_load(self):
+        # Seed right away when loaded into a running bot (e.g. /update_reload)
+        if self.bot.is_ready() and not booster_registry.seeded:
+            await self._seed()
+        self._reseed_task = asyncio.create_task(self._reseed_loop())
+
+    async def cog_unload(self):
+        if self._reseed_task:
+            self._reseed_task.cancel()
+            self._reseed_task = None
+
+    async def _reseed_loop(self):
+        while True:
+            await asyncio.sleep(RESEED_INTERVAL)
+            if self.bot.is_ready():
+                await self._seed()
+
+    async def _seed(self):
+        guild = self.bot.get_guild(SUPPORT_SERVER_ID)
+        if not guild:
+            return
+        try:
+            await booster_registry.seed(guild)
+            print(f"[Boosters] Seeded {len(booster_registry.boosters)} boosters.")
+        except discord.HTTPException as e:
+            print(f"[Boosters] Failed to seed boosters: {e}")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not booster_registry.seeded:
+            await self._seed()
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.guild.id == SUPPORT_SERVER_ID and before.premium_since != after.premium_since:
+            booster_registry.update(after)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        if payload.guild_id == SUPPORT_SERVER_ID:
+            booster_registry.discard(payload.user.id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Boosters(bot))
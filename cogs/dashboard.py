@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from discord import ui
+from utils.role_index import get_role_index
 
 class Dashboard(commands.Cog):
     """Cog that provides a dashboard for reporting bugs."""
@@ -37,7 +38,7 @@ class Dashboard(commands.Cog):
         embed.set_thumbnail(url=self.bot.user.avatar.url)
         # if user has a dev roles add extra more buttons and info
         member = interaction.guild.get_member(interaction.user.id) if interaction.guild else None
-        if member and any(role.id in [954135885392252940] for role in member.roles):
+        if member and get_role_index(self.bot).is_dev(member):
             embed.add_field(
                 name="Developer Options",
                 value="As a developer, you have access to additional options in the dashboard.",
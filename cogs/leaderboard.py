@@ -2,7 +2,15 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
+import os
 import traceback
+from dotenv import load_dotenv
+from utils.http_client import get_http_client
+from utils.models import PlayerStats
+
+load_dotenv()
+# Leave unset to serve the mock data below
+API_LEADERBOARD = os.getenv("API_LEADERBOARD", "")
 
 # MOCK DATA FOR TESTING
 TEST_LEADERBOARD = [
@@ -24,6 +32,7 @@ class LeaderboardTest(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.http = get_http_client(bot)
         self.debug = True
 
     async def debug_log(self, *msg):
@@ -31,10 +40,15 @@ class LeaderboardTest(commands.Cog):
             print("[LeaderboardTest DEBUG]:", *msg)
 
     async def fetch_leaderboard(self):
-        """Mock fetch function. Replace with API call later."""
+        """Fetches the leaderboard from API_LEADERBOARD, or mock data while it is unset."""
+        if API_LEADERBOARD:
+            await self.debug_log("Fetching URL:", API_LEADERBOARD)
+            status, data = await self.http.get_json(API_LEADERBOARD)
+            await self.debug_log("Status Code:", status)
+            return PlayerStats.from_api_list(data)
         await self.debug_log("Fetching mock leaderboard...")
         await asyncio.sleep(0.5)  # simulate network delay
-        return TEST_LEADERBOARD
+        return PlayerStats.from_api_list(TEST_LEADERBOARD)
 
     @app_commands.command(name="wtfleaderboard", description="Get the WTF leaderboard (test version).")
     async def wtfleaderboard(self, interaction: discord.Interaction):
@@ -55,10 +69,6 @@ class LeaderboardTest(commands.Cog):
             embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/1448886491416629349/1448887023803961447/wtf-waifu-tactical-force.png?ex=693ce4b1&is=693b9331&hm=99784c82217f0fc1ad21b710f9d6f7c5570d5e97a234485e255ca7e35c792e7f&")
 
             for idx, player in enumerate(leaderboard, start=1):
-                kills = player.get("TotalKills", 0)
-                deaths = player.get("TotalDeaths", 0)
-                kd = round(kills / deaths, 2) if deaths > 0 else kills
-
                 # Use special emojis for top 3
                 if idx == 1:
                     rank_display = "<:letterw:1448898982725025812>"
@@ -70,8 +80,8 @@ class LeaderboardTest(commands.Cog):
                     rank_display = str(idx)
 
                 embed.add_field(
-                    name=f"{rank_display}. {player.get('PlayerName', 'Unknown')} (Level {player.get('Level', 0)})",
-                    value=f"Kills: {kills} | Deaths: {deaths} | K/D: {kd} | Assists: {player.get('TotalAssists',0)}",
+                    name=f"{rank_display}. {player.name} (Level {player.level})",
+                    value=f"Kills: {player.kills} | Deaths: {player.deaths} | K/D: {player.kd} | Assists: {player.assists}",
                     inline=False
                 )
 
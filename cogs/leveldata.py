@@ -1,10 +1,9 @@
-import json
 import traceback
-from pathlib import Path
 
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.models import LevelTable
 
 
 class LevelData(commands.Cog):
@@ -12,41 +11,29 @@ class LevelData(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.levels = {}
-        self.xp_rewards = {}
+        self.table = LevelTable({})
         self._load_levels()
 
     def _load_levels(self):
         try:
-            data_path = Path(__file__).resolve().parents[1] / "data" / "levels.json"
-            # Fallback to relative 'data/levels.json' if layout differs
-            if not data_path.exists():
-                data_path = Path("data") / "levels.json"
-
-            with open(data_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            raw_levels = data.get("levels", {}) if isinstance(data, dict) else {}
-            # Convert keys to ints for easier lookup
-            self.levels = {int(k): int(v) for k, v in raw_levels.items()}
-
-            # Load XP rewards table if present
-            raw_xp = data.get("XPRewards", {}) if isinstance(data, dict) else {}
-            for k, v in raw_xp.items():
-                try:
-                    self.xp_rewards[k] = int(v)
-                except Exception:
-                    self.xp_rewards[k] = v
-
+            self.table = LevelTable.load("data/levels.json")
         except Exception as e:
             traceback.print_exc()
-            self.levels = {}
+            self.table = LevelTable({})
+
+    @property
+    def levels(self):
+        return self.table.levels
+
+    @property
+    def xp_rewards(self):
+        return self.table.xp_rewards
 
     def xp_for(self, level: int):
-        return self.levels.get(level)
+        return self.table.xp_for(level)
 
     def reward_for(self, key: str):
-        return self.xp_rewards.get(key)
+        return self.table.reward_for(key)
 
     @app_commands.command(name="levelinfo", description="Explain the WTF leveling system based on current level table.")
     async def levelinfo(self, interaction: discord.Interaction):
@@ -63,7 +50,7 @@ class LevelData(commands.Cog):
             "Below are some example level thresholds from the current table:"
         )
 
-        sample_levels = [1, 5, 10, 25, 50, max(self.levels.keys())]
+        sample_levels = [1, 5, 10, 25, 50, self.table.max_level]
         table = []
         for lv in sample_levels:
             xp = self.xp_for(lv)
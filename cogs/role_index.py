@@ -0,0 +1,50 @@
+import discord
+from discord.ext import commands
+from utils.role_index import get_role_index
+
+
+class RoleIndexEvents(commands.Cog):
+    """Keeps the shared role index in sync with role and member events."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.index = get_role_index(bot)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self.index.index_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.index.index_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.index.forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.index.add_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.index.delete_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self.index.rename_role(before, after)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self.index.update_member(after)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.index.remove_member(payload.guild_id, payload.user.id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RoleIndexEvents(bot))
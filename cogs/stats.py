@@ -1,11 +1,19 @@
 import discord
+import asyncio
 import os
 import io
+import re
+from typing import Optional
 import traceback
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
-import aiohttp
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.hedged_request import LatencyWindow, hedged
+from utils.http_client import get_http_client
+from utils.models import PlayerStats as PlayerStatsData
+from utils.role_index import DEV_ROLE_IDS, get_role_index
+from utils.stats_cache import StatsCache
 from utils.stats_img import generate_stats_image
 
 load_dotenv()
@@ -13,26 +21,72 @@ API_LINK = os.getenv("API_LINK", "")
 API_STAT = "playerStats?steamID={}"
 API_URL = API_LINK + API_STAT
 
+# Player stats cache: fresh for CACHE_TTL, then served stale while refreshing for CACHE_STALE_TTL more
+CACHE_SIZE = 1024
+CACHE_TTL = 60
+CACHE_STALE_TTL = 240
+
+# Stats API protection: fail fast after BREAKER_FAILURES errors in a row, probe again after BREAKER_RESET
+BREAKER_FAILURES = 5
+BREAKER_RESET = 30
+# Hedge a lookup once it is slower than the recent p95, clamped to this range; give up after API_TIMEOUT
+HEDGE_MIN_DELAY = 0.2
+HEDGE_MAX_DELAY = 3.0
+API_TIMEOUT = 8
+
+# /wtfcompare: SteamIDs per command, and API requests in flight across all comparisons
+MAX_COMPARE = 8
+COMPARE_CONCURRENCY = 8
+
 class PlayerStats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.http = get_http_client(bot)
+        self.cache = StatsCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL)
+        self.compare_limit = asyncio.Semaphore(COMPARE_CONCURRENCY)
+        self.breaker = CircuitBreaker(failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET)
+        self.latency = LatencyWindow()
         self.debug = True
 
     async def debug_log(self, *msg):
         if self.debug:
             print("[PlayerStats DEBUG]:", *msg)
 
-    async def fetch_stats(self, steamid: str):
+    async def _get_once(self, url: str):
+        status, data = await self.http.get_json(url)
+        await self.debug_log("Status Code:", status)
+        if status >= 500:
+            raise RuntimeError(f"Stats API returned {status}")
+        return data
+
+    def _hedge_delay(self):
+        # Half-open probes are never duplicated; the API may still be recovering
+        p95 = self.latency.percentile(95)
+        if p95 is None or self.breaker.state != CircuitBreaker.CLOSED:
+            return None
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
+
+    async def _request_stats(self, steamid: str):
         url = API_URL.format(steamid)
         await self.debug_log("Fetching URL:", url)
+
+        async def attempt():
+            return await asyncio.wait_for(
+                hedged(lambda: self._get_once(url), self._hedge_delay(), self.latency), timeout=API_TIMEOUT
+            )
+
+        data = await self.breaker.call(attempt)
+        # Parsed outside the breaker: a malformed player record is not an API outage
+        return PlayerStatsData.from_api(data, steamid)
+
+    async def fetch_stats(self, steamid: str) -> Optional[PlayerStatsData]:
+        """Cached stats lookup; concurrent calls for one SteamID share a request."""
+        steamid = steamid.strip()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    await self.debug_log("Status Code:", resp.status)
-                    if resp.status != 200:
-                        return None
-                    data = await resp.json()
-                    return data
+            return await self.cache.get(steamid, lambda: self._request_stats(steamid))
+        except CircuitOpenError as e:
+            await self.debug_log("Stats API unavailable:", e)
+            return None
         except Exception as e:
             await self.debug_log("Exception in fetch_stats:", e)
             traceback.print_exc()
@@ -43,20 +97,12 @@ class PlayerStats(commands.Cog):
         await interaction.response.defer()
         await self.debug_log("Command invoked by", interaction.user, "steamid", steamid)
 
-        data = await self.fetch_stats(steamid)
-        if not data:
+        stats = await self.fetch_stats(steamid)
+        if not stats:
             return await interaction.followup.send("❌ Could not fetch stats. Invalid SteamID or API offline.")
 
-        if isinstance(data, list) and len(data) > 0:
-            data = data[0]
-
         # Build embed summary
-        kills = data.get("TotalKills", 0)
-        deaths = data.get("TotalDeaths", 0)
-        assists = data.get("TotalAssists", 0)
-        kd = round(kills / deaths, 2) if deaths > 0 else kills
-        level = data.get("Level", 0)
-
+        kd = stats.kd
         if kd >= 2:
             embed_color = discord.Color.green()
         elif kd >= 1:
@@ -66,18 +112,18 @@ class PlayerStats(commands.Cog):
 
         embed = discord.Embed(
             title=f"🎮 WTF Player Stats",
-            description=f"**SteamID:** `{steamid}`\n**Level:** `{level}` ⭐",
+            description=f"**SteamID:** `{steamid}`\n**Level:** `{stats.level}` ⭐",
             color=embed_color
         )
         embed.add_field(name="🔥 Performance", value=(
             f"**K/D:** `{kd}`\n"
-            f"**Kills:** `{kills}` | **Deaths:** `{deaths}` | **Assists:** `{assists}`\n"
+            f"**Kills:** `{stats.kills}` | **Deaths:** `{stats.deaths}` | **Assists:** `{stats.assists}`\n"
         ), inline=False)
 
         # generate image (this generator is synchronous, so run in executor to avoid blocking)
         try:
             loop = interaction.client.loop
-            img_buffer = await loop.run_in_executor(None, generate_stats_image, data)
+            img_buffer = await loop.run_in_executor(None, generate_stats_image, stats)
             file = discord.File(img_buffer, filename="wtfstats.png")
             embed.set_image(url="attachment://wtfstats.png")
             await interaction.followup.send(embed=embed, file=file)
@@ -87,5 +133,86 @@ class PlayerStats(commands.Cog):
             traceback.print_exc()
             await interaction.followup.send(embed=embed)
 
+    async def _fetch_limited(self, steamid: str):
+        async with self.compare_limit:
+            return await self.fetch_stats(steamid)
+
+    @app_commands.command(name="wtfcompare", description=f"Compare up to {MAX_COMPARE} WTF players by Steam ID.")
+    @app_commands.describe(steamids="Steam IDs separated by spaces or commas")
+    async def wtfcompare(self, interaction: discord.Interaction, steamids: str):
+        ids = list(dict.fromkeys(i for i in re.split(r"[\s,]+", steamids) if i))
+        if len(ids) < 2:
+            return await interaction.response.send_message("❌ Give at least two Steam IDs to compare.", ephemeral=True)
+        if len(ids) > MAX_COMPARE:
+            return await interaction.response.send_message(f"❌ You can compare at most {MAX_COMPARE} players at once.", ephemeral=True)
+
+        await interaction.response.defer()
+        await self.debug_log("Compare invoked by", interaction.user, "steamids", ids)
+
+        # All lookups run concurrently, so the command costs about one API round trip
+        results = await asyncio.gather(*(self._fetch_limited(i) for i in ids))
+        players = []
+        failed = []
+        for steamid, stats in zip(ids, results):
+            if stats is None:
+                failed.append(steamid)
+            else:
+                players.append(stats)
+
+        if not players:
+            return await interaction.followup.send("❌ Could not fetch stats for any of those Steam IDs. Invalid SteamIDs or API offline.")
+
+        players.sort(key=lambda p: p.kd, reverse=True)
+        best = {key: max(getattr(p, key) for p in players) for key in ("kd", "kills", "level")}
+
+        def mark(player, key):
+            value = getattr(player, key)
+            return f"**{value}** 🏆" if len(players) > 1 and value == best[key] else f"{value}"
+
+        embed = discord.Embed(
+            title="⚔️ WTF Player Comparison",
+            description=f"Ranked by K/D across **{len(players)}** players.",
+            color=discord.Color(0x8fb5f0)
+        )
+        for idx, player in enumerate(players, start=1):
+            embed.add_field(
+                name=f"{idx}. {player.name} (Level {mark(player, 'level')})",
+                value=(
+                    f"**K/D:** {mark(player, 'kd')} | **Kills:** {mark(player, 'kills')} | "
+                    f"**Deaths:** {player.deaths} | **Assists:** {player.assists}\n"
+                    f"`{player.steam_id}`"
+                ),
+                inline=False
+            )
+        if failed:
+            embed.add_field(name="⚠️ Not found", value=", ".join(f"`{i}`" for i in failed), inline=False)
+        embed.set_footer(text=f"{len(players)}/{len(ids)} players fetched")
+        await interaction.followup.send(embed=embed)
+        await self.debug_log("Sent compare embed,", len(failed), "failed.")
+
+    @app_commands.command(name="wtfstatscache", description="Show /wtfstats cache and API counters (dev only).")
+    async def wtfstatscache(self, interaction: discord.Interaction):
+        if DEV_ROLE_IDS and not (isinstance(interaction.user, discord.Member) and get_role_index(self.bot).is_dev(interaction.user)):
+            return await interaction.response.send_message("You are not authorized to run this command.", ephemeral=True)
+
+        stats = self.cache.stats()
+        embed = discord.Embed(title="🗃️ Stats Cache", color=discord.Color.blurple())
+        embed.add_field(name="Lookups", value=(
+            f"**Hits:** `{stats['hits']}` | **Stale:** `{stats['stale_hits']}`\n"
+            f"**Misses:** `{stats['misses']}` | **Coalesced:** `{stats['coalesced']}`\n"
+            f"**Hit rate:** `{stats['hit_rate']:.1%}`"
+        ), inline=False)
+        embed.add_field(name="Backend", value=(
+            f"**Refreshes:** `{stats['refreshes']}` | **Errors:** `{stats['errors']}`\n"
+            f"**Entries:** `{stats['size']}/{CACHE_SIZE}` | **In flight:** `{stats['inflight']}`"
+        ), inline=False)
+        p95 = self.latency.percentile(95)
+        embed.add_field(name="API", value=(
+            f"**Circuit:** `{self.breaker.state}` | **Failures:** `{self.breaker.failures}` | **Rejected:** `{self.breaker.rejected}`\n"
+            f"**p95:** `{f'{p95 * 1000:.0f} ms' if p95 is not None else 'n/a'}`"
+        ), inline=False)
+        embed.set_footer(text=f"TTL {CACHE_TTL}s + {CACHE_STALE_TTL}s stale")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(PlayerStats(bot))
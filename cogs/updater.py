@@ -7,9 +7,12 @@ import traceback
 from datetime import datetime
 from discord import app_commands
 from discord.ext import commands
+from typing import Literal
+from utils.command_checks import toggle_command
+from utils.command_sync import get_sync_scheduler
+from utils.role_index import DEV_ROLE_IDS, get_role_index
 
 GITHUB_REPO = "https://github.com/unclemelo/Hexbyte"
-DEV_ROLE_ID = [954135885392252940]
 
 class Updater(commands.Cog):
     def __init__(self, bot):
@@ -19,9 +22,11 @@ class Updater(commands.Cog):
     # Helper: Check for developer role
     # -------------------------------------------------
     async def _is_dev(self, interaction: discord.Interaction):
-        if DEV_ROLE_ID == 0:
+        if not DEV_ROLE_IDS:
             return True
-        return any(role.id == DEV_ROLE_ID for role in interaction.user.roles)
+        if not isinstance(interaction.user, discord.Member):
+            return False
+        return get_role_index(self.bot).is_dev(interaction.user)
 
     # -------------------------------------------------
     # Helper: Send error embed
@@ -135,6 +140,8 @@ class Updater(commands.Cog):
                 except Exception as e:
                     failed.append(f"{ext}: {e}")
                     print(f"Failed to reload {ext}: {e}")
+            # Point guild-scoped command copies at the reloaded commands
+            get_sync_scheduler(self.bot).refresh_local_copies()
 
             embed = discord.Embed(title="♻️ Reloaded Cogs", color=discord.Color.green())
             embed.add_field(name="Reloaded", value=f"```\n{chr(10).join(reloaded) or 'None'}\n```", inline=False)
@@ -180,6 +187,27 @@ class Updater(commands.Cog):
         except Exception as e:
             await self.send_error_embed(interaction, e, "update_info")
 
+    # -------------------------------------------------
+    # /togglecommand
+    # -------------------------------------------------
+    @app_commands.command(name="togglecommand", description="Enable/disable a command, or set DevOnly/maintenance, in this server.")
+    async def toggle_command_cmd(self, interaction: discord.Interaction, command: str, value: bool,
+                                 category: Literal["General", "DevOnly", "UnderMaintenance"] = "General"):
+        if not await self._is_dev(interaction):
+            return await interaction.response.send_message("You are not authorized to run this command.", ephemeral=True)
+        if interaction.guild_id is None:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        if self.bot.tree.get_command(command) is None:
+            return await interaction.response.send_message(f"❌ Unknown command `{command}`.", ephemeral=True)
+        if command == "togglecommand" and category != "DevOnly":
+            return await interaction.response.send_message("❌ `togglecommand` can't be disabled.", ephemeral=True)
+
+        # Queues a coalesced command sync for this guild via the gate listeners
+        toggle_command(interaction.guild_id, command, value, category)
+        await interaction.response.send_message(
+            f"✅ `{command}` → {category} = `{value}`. Commands update in a few seconds.", ephemeral=True
+        )
+
 
 async def setup(bot):
     await bot.add_cog(Updater(bot))
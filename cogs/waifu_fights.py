@@ -1,34 +1,43 @@
-import discord, random, asyncio, json, os
-from typing import Any, Optional
-from discord.ext import commands, tasks
+import discord, random, asyncio, re
+from typing import Literal, Optional
+from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
-from utils.command_checks import command_enabled
-from utils.booster_cooldown import BoosterCooldownManager
+from datetime import timedelta
+from utils.command_checks import command_gate
+from utils.booster_cooldown import BoosterCooldownManager, get_cooldown_backend
+from utils.royale_store import RoyaleStatsStore, xp_needed
+from utils.royale_events import COMPACT_INTERVAL, RoyaleEventLog
+from utils.persistent_dict import PersistentDict
+from utils.deathlog import DeathLog
+from utils.weapon_sampler import CRIT_TIMEOUT_MULTIPLIER, WeaponTable
+from utils.member_pool import MemberPool
+from utils.mod_queue import ModerationQueue
+from utils.timeout_actors import TimeoutActorCache, is_timeout_change
+from utils.role_index import get_role_index
 
 # === Configuration ===
 CONFIG_FILE = "data/royale_config.json"
-STATS_FILE = "data/royal_stats.json"
+STATS_FILE = "data/royal_stats.json"  # legacy, migrated into STATS_DB on first run
+STATS_DB = "data/royal_stats.db"
 WEAPON_FILE = "data/weaponroyal.json"
 DEATHLOG_FILE = "data/deathlog.json"
+EVENTS_FILE = "data/royale_events.jsonl"
+EVENTS_ARCHIVE = "data/royale_events"
 
 # === Default Config Template ===
 DEFAULT_CONFIG = {
     "knockout_cooldown": 1800,
-    "revive_cooldown": 600
+    "revive_cooldown": 600,
+    "cooldown_backend": "memory",
+    "cooldown_db": "data/cooldowns.db"
 }
 
-if not os.path.exists(CONFIG_FILE):
-    os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(DEFAULT_CONFIG, f, indent=4)
+config = PersistentDict(CONFIG_FILE, default=DEFAULT_CONFIG)
 
-with open(CONFIG_FILE, "r") as f:
-    config = json.load(f)
-
-# Cooldowns
-cooldown_knockout = BoosterCooldownManager(rate=1, per=config.get("knockout_cooldown", 900), bucket_type="user")
-cooldown_revive = BoosterCooldownManager(rate=1, per=config.get("revive_cooldown", 600), bucket_type="user")
+# Cooldowns ("sqlite" shares them across shards/processes on this host)
+cooldown_backend = get_cooldown_backend(config.get("cooldown_backend", "memory"), config.get("cooldown_db", "data/cooldowns.db"))
+cooldown_knockout = BoosterCooldownManager(rate=1, per=config.get("knockout_cooldown", 900), bucket_type="user", name="knockout", backend=cooldown_backend)
+cooldown_revive = BoosterCooldownManager(rate=1, per=config.get("revive_cooldown", 600), bucket_type="user", name="revive", backend=cooldown_backend)
 
 
 class WaifuFights(commands.Cog):
@@ -36,218 +45,159 @@ class WaifuFights(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.stats = self.load_stats()
-        self.weapons = self.load_weapons()
-        self.deathlog = self.load_deathlog()
-        self.cleanup_task.start()
+        self.stats = RoyaleStatsStore(STATS_DB, legacy_json=STATS_FILE)
+        self.weapons = WeaponTable(WEAPON_FILE)
+        self.deathlog = DeathLog(DEATHLOG_FILE)
+        self.events = RoyaleEventLog(EVENTS_FILE, EVENTS_ARCHIVE)
+        self._compactor = None
+        self.timeout_actors = TimeoutActorCache()
+        self.targets = MemberPool()
+        self.mod_queue = ModerationQueue()
         self.debug = True
 
     async def debug_log(self, *msg):
         if self.debug:
             print("[WaifuFights DEBUG]:", *msg)
 
-    async def _last_timeout_actor(self, guild: Optional[discord.Guild], member: discord.Member) -> Optional[discord.abc.User]:
-        """Return the actor (User) who most recently changed the member's timeout via audit logs, or None.
+    async def _last_timeout_actor(self, guild: Optional[discord.Guild], member: discord.Member) -> Optional[discord.abc.Snowflake]:
+        """Return the actor who most recently changed the member's timeout, or None.
 
-        If `guild` is None (e.g., command invoked in DMs), return None immediately.
+        Answered from the audit-log event cache when possible; falls back to
+        reading recent audit logs over REST. If `guild` is None (e.g., command
+        invoked in DMs), return None immediately.
         """
         if guild is None:
             return None
+        actor = self.timeout_actors.get(guild.id, member.id)
+        if actor is not None:
+            return actor
         try:
             async for entry in guild.audit_logs(limit=20, action=discord.AuditLogAction.member_update):
                 # The audit log member_update may include changes; find entries targeting this member
                 if not entry.target or getattr(entry.target, "id", None) != member.id:
                     continue
-
-                # entry.changes can be iterable in some discord.py versions, but may not be in others.
-                changes: Any = entry.changes
-                found = False
-
-                # Prefer explicit sequence types to satisfy static checkers (AuditLogChanges may not be iterable)
-                if isinstance(changes, (list, tuple)):
-                    for change in changes:
-                        attr = getattr(change, 'attribute', None) or getattr(change, 'key', None)
-                        if attr == 'communication_disabled_until':
-                            found = True
-                            break
-
-                # Fallback: inspect string representation for the attribute name
-                if not found:
-                    try:
-                        if 'communication_disabled_until' in str(changes):
-                            found = True
-                    except Exception:
-                        found = False
-
-                if found:
+                if is_timeout_change(entry):
+                    self.timeout_actors.record(guild.id, member.id, entry.user or discord.Object(id=entry.user_id))
                     return entry.user
             return None
         except Exception:
             return None
 
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        self.timeout_actors.record_entry(entry)
+
     async def _try_clear_timeout(self, member: discord.Member, reason: str = "Revived") -> bool:
-        """Attempt to clear a member timeout safely, with retries for rate limits."""
-        for attempt in range(3):
-            try:
-                # discord.Member.timeout accepts None to clear timeout
-                await member.timeout(None, reason=reason)
-                await asyncio.sleep(1.0)
-                return True
-            except discord.Forbidden:
-                return False
-            except discord.HTTPException as e:
-                # handle rate limit and other HTTP issues
-                try:
-                    retry_after = float(e.response.headers.get("Retry-After", 1.0))
-                    await asyncio.sleep(retry_after + 0.25)
-                except Exception:
-                    await asyncio.sleep(1.0)
-            except Exception:
-                await asyncio.sleep(0.25)
-        return False
-
-    def load_stats(self):
-        os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
-        if not os.path.exists(STATS_FILE):
-            with open(STATS_FILE, "w") as f: json.dump({}, f)
-        with open(STATS_FILE, "r") as f:
-            return json.load(f)
-
-    def save_stats(self):
-        with open(STATS_FILE, "w") as f:
-            json.dump(self.stats, f, indent=4)
-
-    def load_weapons(self):
-        if not os.path.exists(WEAPON_FILE):
-            raise FileNotFoundError(f"Weapon file missing: {WEAPON_FILE}")
-        with open(WEAPON_FILE, "r") as f:
-            return json.load(f)
-
-    def load_deathlog(self):
-        os.makedirs(os.path.dirname(DEATHLOG_FILE), exist_ok=True)
-        if not os.path.exists(DEATHLOG_FILE):
-            with open(DEATHLOG_FILE, "w") as f: json.dump({}, f)
-        with open(DEATHLOG_FILE, "r") as f:
-            return json.load(f)
-
-    def save_deathlog(self):
-        with open(DEATHLOG_FILE, "w") as f:
-            json.dump(self.deathlog, f, indent=4)
+        """Clear a member timeout through the guild's moderation queue."""
+        ok, _ = await self.mod_queue.timeout(member, None, reason=reason)
+        return ok
 
     # === Stats Management ===
-    def get_user(self, user_id):
-        user_key = str(user_id)
-        if user_key not in self.stats:
-            self.stats[user_key] = {
-                "kills": 0, "deaths": 0, "revives": 0, "failed_revives": 0,
-                "xp": 0, "level": 1, "prestige": 0
-            }
-        return self.stats[user_key]
+    async def cog_load(self):
+        await self.stats.open()
+        # Fights logged but not yet committed when the bot last stopped
+        replayed = await self.stats.replay(self.events.replay(self.stats.applied_seq))
+        if replayed:
+            print(f"[Royale] Replayed {replayed} fight events from {EVENTS_FILE}")
+        # Never hand out a seq the snapshot has already applied
+        self.events.seq = max(self.events.seq, self.stats.applied_seq)
+        self.events.start()
+        self._compactor = asyncio.create_task(self._compact_events())
+        self.deathlog.start()
+
+    async def cog_unload(self):
+        if self._compactor:
+            self._compactor.cancel()
+        self.mod_queue.close()
+        await self.deathlog.close()
+        await config.close()
+        await self.events.close()
+        await self.stats.close()
+
+    async def _compact_events(self):
+        """Periodically checkpoints the stats snapshot and archives applied log segments."""
+        while True:
+            await asyncio.sleep(COMPACT_INTERVAL)
+            try:
+                await self.stats.checkpoint()
+                if await self.events.compact(self.stats.applied_seq):
+                    print(f"[Royale] Archived fight events up to seq {self.events.seq}")
+            except Exception as e:
+                print(f"[Royale] Event log compaction failed: {e}")
+
+    async def record_knockout(self, guild_id, attacker_id, victim_id, weapon_key=None, crit=False, xp_gain=0):
+        """Writes the knockout to the event log, then commits it to the stats; returns (leveled_up, level)."""
+        event = await self.events.append(
+            "knockout", guild=guild_id, attacker=attacker_id, victim=victim_id,
+            weapon=weapon_key, crit=crit, xp=xp_gain
+        )
+        return await self.stats.record_knockout(attacker_id, victim_id, xp_gain, event["seq"])
+
+    async def get_user(self, user_id):
+        return await self.stats.get_user(user_id)
 
     def xp_needed(self, level: int):
-        return 100 + (level * 25)
-
-    def add_xp(self, user_id, amount: int):
-        user = self.get_user(user_id)
-        user["xp"] += amount
-        leveled_up = False
-        while user["xp"] >= self.xp_needed(user["level"]):
-            user["xp"] -= self.xp_needed(user["level"])
-            user["level"] += 1
-            if user["level"] > 15:
-                user["level"] = 15
-            leveled_up = True
-        self.save_stats()
+        return xp_needed(level)
+
+    async def add_xp(self, user_id, amount: int):
+        leveled_up, _ = await self.stats.add_xp(user_id, amount)
         return leveled_up
 
-    def add_kill(self, user_id):
-        self.get_user(user_id)["kills"] += 1
-        self.save_stats()
-
-    def add_death(self, user_id):
-        self.get_user(user_id)["deaths"] += 1
-        self.save_stats()
-
-    def add_revive(self, user_id, success: bool):
-        user = self.get_user(user_id)
-        if success:
-            user["revives"] += 1
-            xp_gain = random.randint(15, 30)
-            leveled_up = self.add_xp(user_id, xp_gain)
-            return xp_gain, leveled_up
-        else:
-            user["failed_revives"] += 1
-            self.save_stats()
-            return 0, False
-
-    # === Background Cleanup ===
-    @tasks.loop(minutes=5)
-    async def cleanup_task(self):
-        removed = []
-        for guild in self.bot.guilds:
-            for user_id in list(self.deathlog.keys()):
-                try:
-                    member = guild.get_member(int(user_id))
-                    if not member:
-                        continue
-                    timeout_end = datetime.fromisoformat(self.deathlog[user_id]["timeout_end"])
-                    if member.timed_out_until is None or member.timed_out_until < discord.utils.utcnow() or timeout_end < discord.utils.utcnow():
-                        self.deathlog.pop(user_id, None)
-                        removed.append(user_id)
-                except Exception as e:
-                    print(f"[Royale] Cleanup error for {user_id}: {e}")
-        if removed:
-            self.save_deathlog()
-            print(f"[Royale] Cleaned {len(removed)} entries from deathlog.")
+    async def add_xp_batch(self, grants):
+        """Applies many (user_id, xp) grants (events, imports, admin fixes) in one commit."""
+        return await self.stats.add_xp_batch(grants)
+
+    async def add_revive(self, user_id, success: bool, guild_id=None, target_id=None):
+        """Records a revive attempt; returns (xp_gain, leveled_up, level)."""
+        xp_gain = random.randint(15, 30) if success else 0
+        event = await self.events.append("revive", guild=guild_id, user=user_id, target=target_id, success=success, xp=xp_gain)
+        leveled_up, level = await self.stats.record_revive(user_id, success, xp_gain, event["seq"])
+        return xp_gain, leveled_up, level
+
+    # === Member Events ===
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # A manual untimeout ends the knockout right away
+        if before.timed_out_until and not after.is_timed_out():
+            self.deathlog.remove(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.targets.add(member)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.targets.remove(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.targets.forget_guild(guild.id)
+        self.timeout_actors.forget_guild(guild.id)
 
     # --- Safe Timeout Helper ---
-    async def safe_timeout(self, member: discord.Member, until, reason, delay=1.15):
-        try:
-            await member.timeout(until, reason=reason)
-            await asyncio.sleep(delay)
-            return True, None
-        except discord.Forbidden:
-            return False, "forbidden"
-        except discord.HTTPException as e:
-            if e.status == 429:
-                try:
-                    retry_after = e.response.headers.get("Retry-After")
-                    if retry_after:
-                        await asyncio.sleep(float(retry_after))
-                except Exception:
-                    await asyncio.sleep(1)
-                return False, "rate_limited"
-            return False, str(e)
-        except Exception as e:
-            return False, str(e)
-
-    @cleanup_task.before_loop
-    async def before_cleanup(self):
-        await self.bot.wait_until_ready()
+    async def safe_timeout(self, member: discord.Member, until, reason):
+        """Apply a timeout through the guild's moderation queue; returns (ok, error)."""
+        return await self.mod_queue.timeout(member, until, reason=reason)
 
     @app_commands.command(name="waifufights", description="Knock someone out with a random weapon!")
-    @command_enabled()
-    async def waifufightcmd(self, interaction: discord.Interaction, member: discord.Member):
-        import random
-        from datetime import timedelta
-
+    @app_commands.describe(member="Who to knock out (leave empty for a random target)")
+    @command_gate()
+    async def waifufightcmd(self, interaction: discord.Interaction, member: Optional[discord.Member] = None):
         await interaction.response.defer(thinking=True, ephemeral=False)
 
         # Cooldown
-        remaining = await cooldown_knockout.get_remaining(interaction)
+        remaining = await cooldown_knockout.acquire(interaction)
         if remaining > 0:
             return await interaction.followup.send(
                 f"⏳ Slow down! Try again in **{round(remaining, 1)}s**.",
                 ephemeral=True
             )
-        await cooldown_knockout.trigger(interaction)
 
         # Auto-select a target if none given
         if member is None:
-            candidates = [m for m in interaction.guild.members if not m.bot and m != interaction.user]
-            if not candidates:
+            member = self.targets.sample(interaction.guild, exclude_id=interaction.user.id)
+            if member is None:
                 return await interaction.followup.send("No valid targets found.", ephemeral=True)
-            member = random.choice(candidates)
 
         # Self knockout check
         if member == interaction.user:
@@ -267,95 +217,65 @@ class WaifuFights(commands.Cog):
             )
 
         # === Weapon Selection ===
-        # Exclude dangerous/removed weapons like 'nuke' from runtime selection
-        weapon_keys = [k for k in self.weapons.keys() if k != "nuke"]
-        weights = []
-        for key in weapon_keys:
-            if key == "garande_hug":
-                weights.append(50)
-            else:
-                weights.append(100)
-
-        weapon_key = random.choices(weapon_keys, weights=weights, k=1)[0]
-        weapon = self.weapons[weapon_key]
+        # Weights live in weaponroyal.json ('nuke' is always excluded); the
+        # alias tables are only rebuilt when the file changes on disk
+        self.weapons.refresh()
+        weapon_key, weapon = self.weapons.pick_weapon()
 
         # Timeout calculation
-        raw_timeout = random.choice(weapon["timeout"]) if isinstance(weapon.get("timeout"), list) else weapon.get("timeout")
-        timeout_value = int(raw_timeout) if str(raw_timeout).isdigit() else 30
-        xp_multi = weapon.get("xp_multiplier", 1.0)
-        outcome = random.choices(["hit", "miss", "crit"], weights=[0.7, 0.15, 0.15])[0]
+        timeout_value = self.weapons.pick_timeout(weapon_key)
+        outcome = self.weapons.pick_outcome()
 
-        embed = discord.Embed(color=discord.Color.magenta(), title=weapon.get("title", "Knockout"))
-        embed.set_image(url=weapon.get("gif", ""))
+        embed = discord.Embed(color=discord.Color.magenta(), title=weapon.title)
+        embed.set_image(url=weapon.gif)
 
         # Miss outcome
         if outcome == "miss":
             embed.description = (
                 f"😅 {interaction.user.mention} missed {member.mention}!\n"
-                f"> {random.choice(weapon.get('miss_lines', ['They missed!']))}"
+                f"> {random.choice(weapon.miss_lines)}"
             )
             embed.set_footer(text=f"🕐 Cooldown: {config.get('knockout_cooldown', 1800)//60} min")
             return await interaction.followup.send(embed=embed)
 
         # Critical or normal hit
         crit = outcome == "crit"
-        duration = timeout_value * (2 if crit else 1)
+        duration = timeout_value * (CRIT_TIMEOUT_MULTIPLIER if crit else 1)
         now = discord.utils.utcnow()
 
-        async def try_timeout(target: discord.Member, seconds: int, reason: str):
-            for attempt in range(3):
-                try:
-                    await target.timeout(now + timedelta(seconds=seconds), reason=reason)
-                    await asyncio.sleep(1.15)
-                    return True
-                except discord.Forbidden:
-                    return False
-                except discord.HTTPException as e:
-                    if e.status == 429:
-                        retry_after = float(e.response.headers.get("Retry-After", 1.3))
-                        await asyncio.sleep(retry_after + 0.25)
-                    else:
-                        return False
-                except Exception:
-                    await asyncio.sleep(0.25)
-            return False
-
         try:
-            ok = await try_timeout(member, duration, "Knockout!")
+            ok, _ = await self.safe_timeout(member, now + timedelta(seconds=duration), "Knockout!")
             if not ok:
                 embed.title = "🚫 Target Protected!"
                 embed.description = f"{member.mention} resisted the attack!"
-                self.add_kill(interaction.user.id)
-                self.add_death(member.id)
+                await self.record_knockout(interaction.guild.id, interaction.user.id, member.id, weapon_key, crit)
                 embed.set_image(url="https://media.discordapp.net/attachments/1308048258337345609/1435509129136439428/nope-anime.gif")
                 embed.set_footer(text=f"🕐 Cooldown: {config.get('knockout_cooldown', 900)//60} min")
                 return await interaction.followup.send(embed=embed)
 
             # XP and stats
-            xp_gain = int(random.randint(20 if crit else 10, 35 if crit else 25) * xp_multi)
-            leveled = self.add_xp(interaction.user.id, xp_gain)
-            self.add_kill(interaction.user.id)
-            self.add_death(member.id)
-
-            self.deathlog[str(member.id)] = {
-                "by": interaction.user.id,
-                "weapon": weapon_key,
-                "timeout_end": (now + timedelta(seconds=duration)).isoformat(),
-                "crit": crit
-            }
-            self.save_deathlog()
+            xp_gain = self.weapons.roll_xp(weapon, crit)
+            leveled, level = await self.record_knockout(interaction.guild.id, interaction.user.id, member.id, weapon_key, crit, xp_gain)
+
+            self.deathlog.add(
+                interaction.guild.id, member.id,
+                by=interaction.user.id,
+                weapon=weapon_key,
+                timeout_end=now + timedelta(seconds=duration),
+                crit=crit
+            )
 
             embed.description = (
                 f"🔥 **CRITICAL HIT!** {interaction.user.mention} obliterated {member.mention} with **{weapon_key}!**\n"
-                f"> {random.choice(weapon.get('crit_lines', ['Critical hit!']))}"
+                f"> {random.choice(weapon.crit_lines)}"
                 if crit else
                 f"{interaction.user.mention} hit {member.mention} with **{weapon_key}**!\n"
-                f"> {random.choice(weapon.get('lines', ['Hit!']))}"
+                f"> {random.choice(weapon.lines)}"
             )
 
             embed.add_field(name="🏅 XP Gained", value=f"**+{xp_gain} XP**", inline=False)
             if leveled:
-                embed.add_field(name="🆙 Level Up!", value=f"{interaction.user.mention} reached **Level {self.get_user(interaction.user.id)['level']}!**", inline=False)
+                embed.add_field(name="🆙 Level Up!", value=f"{interaction.user.mention} reached **Level {level}!**", inline=False)
 
             embed.set_footer(text=f"🕐 Cooldown: {config.get('knockout_cooldown', 900)//60} min")
             await interaction.followup.send(embed=embed)
@@ -368,40 +288,40 @@ class WaifuFights(commands.Cog):
                 pass
 
     @app_commands.command(name="revive", description="Attempt to revive (clear timeout) for a knocked-out user.")
-    @command_enabled()
-    async def revivecmd(self, interaction: discord.Interaction, member: discord.Member):
+    @app_commands.describe(member="Who to revive (leave empty for a random knocked-out member)")
+    @command_gate()
+    async def revivecmd(self, interaction: discord.Interaction, member: Optional[discord.Member] = None):
         await interaction.response.defer(thinking=True)
 
         # Cooldown
-        remaining = await cooldown_revive.get_remaining(interaction)
+        remaining = await cooldown_revive.acquire(interaction)
         if remaining > 0:
             return await interaction.followup.send(f"⏳ Slow down! Try again in **{round(remaining,1)}s**.", ephemeral=True)
-        await cooldown_revive.trigger(interaction)
 
         # Choose target if not provided: pick a random deathlog entry present in this guild
         if member is None:
-            candidates = []
-            for uid in list(self.deathlog.keys()):
-                try:
-                    m = interaction.guild.get_member(int(uid))
-                    if m and m.timed_out_until and m.timed_out_until > discord.utils.utcnow():
-                        candidates.append(m)
-                except Exception:
-                    continue
-            if not candidates:
+            # Each miss drops the stale entry, so this ends once the guild's set is empty
+            while member is None:
+                target_id = self.deathlog.random_knocked_out(interaction.guild.id)
+                if target_id is None:
+                    break
+                member = interaction.guild.get_member(target_id)
+                if member is None or not member.is_timed_out():
+                    # Left the server or the timeout already ended
+                    self.deathlog.remove(interaction.guild.id, target_id)
+                    member = None
+            if member is None:
                 return await interaction.followup.send("No valid knocked-out targets found in this server.", ephemeral=True)
-            member = random.choice(candidates)
 
         # Verify target is knocked out via our deathlog
-        entry = self.deathlog.get(str(member.id))
+        entry = self.deathlog.get(interaction.guild.id, member.id)
         if not entry:
             return await interaction.followup.send("❌ That user is not recorded as knocked out by the game. A moderator timeout cannot be bypassed.", ephemeral=True)
 
         # Verify member is actually timed out
         if not member.timed_out_until or member.timed_out_until <= discord.utils.utcnow():
             # cleanup stale entry
-            self.deathlog.pop(str(member.id), None)
-            self.save_deathlog()
+            self.deathlog.remove(interaction.guild.id, member.id)
             return await interaction.followup.send("That user is not currently timed out.", ephemeral=True)
 
         # Check audit log to see who applied the timeout
@@ -424,20 +344,64 @@ class WaifuFights(commands.Cog):
         ok = await self._try_clear_timeout(member, reason=f"Revived by {interaction.user}")
         if not ok:
             # log failure and mark revive as failed
-            self.add_revive(interaction.user.id, success=False)
+            await self.add_revive(interaction.user.id, success=False, guild_id=interaction.guild.id, target_id=member.id)
             return await interaction.followup.send("⚠️ Could not clear the timeout. The user may be protected or the bot lacks permissions.", ephemeral=True)
 
         # Success: remove from deathlog and award XP
-        self.deathlog.pop(str(member.id), None)
-        self.save_deathlog()
-        xp_gain, leveled = self.add_revive(interaction.user.id, success=True)
+        self.deathlog.remove(interaction.guild.id, member.id)
+        xp_gain, leveled, level = await self.add_revive(interaction.user.id, success=True, guild_id=interaction.guild.id, target_id=member.id)
 
         embed = discord.Embed(title="✨ Revived!", description=f"{interaction.user.mention} revived {member.mention}.", color=discord.Color.green())
         embed.add_field(name="🏅 XP Gained", value=f"+{xp_gain} XP", inline=False)
         if leveled:
-            embed.add_field(name="🆙 Level Up!", value=f"{interaction.user.mention} reached Level {self.get_user(interaction.user.id)['level']}!", inline=False)
+            embed.add_field(name="🆙 Level Up!", value=f"{interaction.user.mention} reached Level {level}!", inline=False)
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="royaleleaderboard", description="Show the Waifu Fights leaderboard.")
+    @command_gate()
+    async def royaleleaderboard(self, interaction: discord.Interaction, board: Literal["level", "kills"] = "level", page: int = 1):
+        await interaction.response.defer()
+
+        leaderboard = self.stats.leaderboard
+        per_page = 10
+        total_pages = max(1, -(-len(leaderboard) // per_page))
+        page = min(max(1, page), total_pages)
+        rows = leaderboard.page(board, (page - 1) * per_page, per_page)
+        if not rows:
+            return await interaction.followup.send("❌ No royale stats recorded yet.")
+
+        players = await self.stats.get_users(user_id for _, user_id, _ in rows)
+        lines = []
+        for rank, user_id, _ in rows:
+            player = players.get(user_id, {})
+            lines.append(
+                f"**{rank}.** <@{user_id}> — Level {player.get('level', 1)} ({player.get('xp', 0)} XP) | "
+                f"Kills: {player.get('kills', 0)} | Deaths: {player.get('deaths', 0)}"
+            )
+
+        title = "🏆 Royale Leaderboard — Level" if board == "level" else "🏆 Royale Leaderboard — Kills"
+        embed = discord.Embed(title=title, description="\n".join(lines), color=discord.Color.magenta())
+        my_rank = leaderboard.rank(board, interaction.user.id)
+        embed.set_footer(text=(
+            f"Page {page}/{total_pages} • Your rank: #{my_rank} of {len(leaderboard)}"
+            if my_rank else f"Page {page}/{total_pages} • You aren't ranked yet"
+        ))
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="royalexp", description="[Dev] Grant or remove royale XP for one or more users.")
+    @app_commands.describe(users="Mentions or IDs, separated by spaces", amount="XP to add (negative to remove)")
+    async def royalexp(self, interaction: discord.Interaction, users: str, amount: int):
+        if not isinstance(interaction.user, discord.Member) or not get_role_index(self.bot).is_dev(interaction.user):
+            return await interaction.response.send_message("You are not authorized to run this command.", ephemeral=True)
+        user_ids = [int(token) for token in re.findall(r"\d{15,20}", users)]
+        if not user_ids:
+            return await interaction.response.send_message("❌ No users found in that list.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+
+        results = await self.add_xp_batch((user_id, amount) for user_id in user_ids)
+        lines = [f"<@{user_id}> → Level {level}{' 🆙' if leveled_up else ''}" for user_id, (leveled_up, level) in results.items()]
+        await interaction.followup.send(f"✅ Applied {amount:+} XP to {len(results)} user(s):\n" + "\n".join(lines), ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(WaifuFights(bot))
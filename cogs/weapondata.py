@@ -1,12 +1,11 @@
-import json
 import traceback
-from pathlib import Path
 from typing import Optional
 
 import discord
 from discord.ext import commands
 from discord import app_commands
 from discord import ui
+from utils.models import WeaponStats
 
 
 class WeaponData(commands.Cog):
@@ -19,22 +18,12 @@ class WeaponData(commands.Cog):
 
     def _load_weapons(self):
         try:
-            data_path = Path(__file__).resolve().parents[1] / "data" / "weapons.json"
-            if not data_path.exists():
-                data_path = Path("data") / "weapons.json"
-
-            with open(data_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            raw = data.get("WeaponStats", {}) if isinstance(data, dict) else {}
-            # normalize keys to ints
-            self.weapons = {int(k): v for k, v in raw.items()}
-
+            self.weapons = WeaponStats.load("data/weapons.json")
         except Exception:
             traceback.print_exc()
             self.weapons = {}
 
-    def get_weapon(self, wid: int) -> Optional[dict]:
+    def get_weapon(self, wid: int) -> Optional[WeaponStats]:
         return self.weapons.get(wid)
 
     @app_commands.command(name="weaponinfo", description="Show how weapon stats work and some example weapons.")
@@ -48,39 +37,35 @@ class WeaponData(commands.Cog):
 
         def make_embed_for(index: int) -> discord.Embed:
             wid = ordered_ids[index]
-            w = self.get_weapon(wid) or {}
-            name = w.get("Name", f"Weapon {wid}")
+            w = self.get_weapon(wid)
+
+            def shown(value):
+                return "—" if value is None else value
 
-            e = discord.Embed(title=f"🔫 {name} (ID {wid})", color=discord.Color.dark_gold())
+            e = discord.Embed(title=f"🔫 {w.name} (ID {wid})", color=discord.Color.dark_gold())
             # main stats summary
-            dmg = w.get("BaseDamage", "—")
-            fr = w.get("FireRate", "—")
-            mag = w.get("MaxMagazineAmmo", "—")
-            pellets = w.get("PelletsPerCartridge", "—")
             e.add_field(name="Stats", value=(
-                f"**BaseDamage:** `{dmg}`\n"
-                f"**FireRate (RPM):** `{fr}`\n"
-                f"**Magazine:** `{mag}`\n"
-                f"**Pellets:** `{pellets}`\n"
+                f"**BaseDamage:** `{shown(w.base_damage)}`\n"
+                f"**FireRate (RPM):** `{shown(w.fire_rate)}`\n"
+                f"**Magazine:** `{shown(w.magazine)}`\n"
+                f"**Pellets:** `{shown(w.pellets)}`\n"
             ), inline=False)
 
             # other useful fields
-            misc_lines = []
-            for key in ("MovementSpeed", "ADSSpeed", "LoadedReloadSpeed", "EmptyReloadSpeed", "EquipSpeed", "BulletVelocity", "MaximumRange"):
-                if key in w:
-                    misc_lines.append(f"**{key}:** `{w.get(key)}`")
+            misc_lines = [
+                f"**{field}:** `{getattr(w, attr)}`"
+                for attr, field in WeaponStats.OTHER
+                if getattr(w, attr) is not None
+            ]
             if misc_lines:
                 e.add_field(name="Other", value="\n".join(misc_lines), inline=False)
 
             # show image if present
-            for key in ("SideImage", "Image", "Thumbnail"):
-                url = w.get(key)
-                if url:
-                    try:
-                        e.set_thumbnail(url=url)
-                    except Exception:
-                        pass
-                    break
+            if w.image:
+                try:
+                    e.set_thumbnail(url=w.image)
+                except Exception:
+                    pass
 
             e.set_footer(text=f"Weapon {index+1}/{len(ordered_ids)}")
             return e
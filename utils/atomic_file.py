@@ -0,0 +1,15 @@
+import os
+
+
+def atomic_write_json(path: str, payload: str):
+    """Writes `payload` to a temp file next to `path` and swaps it into place.
+
+    The temp file is fsynced before os.replace, so a crash leaves either the
+    old file or the new one, never a truncated mix.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
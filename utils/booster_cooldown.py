@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands
 import time
-from typing import Literal
+from typing import Literal, Optional
+from utils.sqlite_worker import SQLiteWorker
 
 SUPPORT_SERVER_ID = 1290420853926002789
 
@@ -10,36 +11,226 @@ BUCKET_TYPES = {
     "guild": lambda interaction: interaction.guild.id if interaction.guild else interaction.user.id,
 }
 
+# Sweep expired keys at most this often (seconds); sweeps run inline on access
+SWEEP_INTERVAL = 60.0
+
+
+# -------------------------------
+# Backends
+# -------------------------------
+# A backend stores one GCRA "theoretical arrival time" (wall-clock seconds)
+# per (namespace, key). Wall-clock time is used so separate processes agree.
+
+class MemoryCooldownBackend:
+    """In-process backend. Fast, but each process/shard has its own state."""
+
+    def __init__(self):
+        self.cooldowns = {}  # (namespace, key) -> theoretical arrival time
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+
+    async def peek(self, namespace: str, key, now: float) -> Optional[float]:
+        self.sweep(now)
+        return self.cooldowns.get((namespace, key))
+
+    async def acquire(self, namespace: str, key, now: float, interval: float, tolerance: float) -> float:
+        self.sweep(now)
+        tat = max(self.cooldowns.get((namespace, key), now), now)
+        remaining = tat - tolerance - now
+        if remaining > 0:
+            return remaining
+        self.cooldowns[(namespace, key)] = tat + interval
+        return 0.0
+
+    async def push(self, namespace: str, key, now: float, interval: float):
+        tat = max(self.cooldowns.get((namespace, key), now), now)
+        self.cooldowns[(namespace, key)] = tat + interval
+
+    def sweep(self, now: float):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL
+        expired = [k for k, tat in self.cooldowns.items() if tat <= now]
+        for k in expired:
+            del self.cooldowns[k]
+
+
+class SQLiteCooldownBackend(SQLiteWorker):
+    """SQLite backend shared by every local process using the same file.
+
+    Runs on its own worker thread (see SQLiteWorker). Each check-and-set is
+    one short transaction on an indexed primary key; expired rows are
+    deleted in a single batched statement per sweep.
+    """
+
+    def __init__(self, path: str = "data/cooldowns.db"):
+        super().__init__(path, thread_name="cooldowns")
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+
+    def _setup(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cooldowns ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, tat REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cooldowns_tat ON cooldowns (tat)")
+
+    def _get_tat(self, conn, namespace: str, key) -> Optional[float]:
+        row = conn.execute(
+            "SELECT tat FROM cooldowns WHERE namespace = ? AND key = ?", (namespace, str(key))
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_tat(self, conn, namespace: str, key, tat: float):
+        conn.execute(
+            "INSERT INTO cooldowns (namespace, key, tat) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET tat = excluded.tat",
+            (namespace, str(key), tat),
+        )
+
+    # === Worker thread only ===
+    def peek_sync(self, namespace: str, key, now: float) -> Optional[float]:
+        self.sweep_sync(now)
+        return self._get_tat(self._connect(), namespace, key)
+
+    def acquire_sync(self, namespace: str, key, now: float, interval: float, tolerance: float) -> float:
+        self.sweep_sync(now)
+        with self._transaction() as conn:
+            tat = max(self._get_tat(conn, namespace, key) or now, now)
+            remaining = tat - tolerance - now
+            if remaining <= 0:
+                self._set_tat(conn, namespace, key, tat + interval)
+        return max(0.0, remaining)
+
+    def push_sync(self, namespace: str, key, now: float, interval: float):
+        with self._transaction() as conn:
+            tat = max(self._get_tat(conn, namespace, key) or now, now)
+            self._set_tat(conn, namespace, key, tat + interval)
+
+    def sweep_sync(self, now: float):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL
+        self._connect().execute("DELETE FROM cooldowns WHERE tat <= ?", (now,))
+
+    # === Async API ===
+    async def peek(self, namespace: str, key, now: float) -> Optional[float]:
+        return await self._run(self.peek_sync, namespace, key, now)
+
+    async def acquire(self, namespace: str, key, now: float, interval: float, tolerance: float) -> float:
+        return await self._run(self.acquire_sync, namespace, key, now, interval, tolerance)
+
+    async def push(self, namespace: str, key, now: float, interval: float):
+        await self._run(self.push_sync, namespace, key, now, interval)
+
+
+# Backends live here rather than in the cogs so a cog reload keeps its cooldowns
+_backends = {}
+
+def get_cooldown_backend(kind: str = "memory", path: str = "data/cooldowns.db"):
+    """Returns a shared backend instance for `kind` ("memory" or "sqlite")."""
+    cache_key = (kind, path if kind == "sqlite" else None)
+    backend = _backends.get(cache_key)
+    if backend is None:
+        if kind == "sqlite":
+            backend = SQLiteCooldownBackend(path)
+        elif kind == "memory":
+            backend = MemoryCooldownBackend()
+        else:
+            raise ValueError(f"Unknown cooldown backend: {kind}")
+        _backends[cache_key] = backend
+    return backend
+
+
+# -------------------------------
+# Booster Registry
+# -------------------------------
+
+class BoosterRegistry:
+    """Set of support-server boosters, seeded from the guild and kept current by events.
+
+    Member updates only arrive for cached members, so cogs/boosters.py also
+    reseeds periodically to catch boosts the events missed.
+    """
+
+    def __init__(self):
+        self.boosters = set()
+        self.seeded = False
+
+    async def seed(self, guild: discord.Guild):
+        if guild.chunked:
+            members = guild.premium_subscribers
+        else:
+            members = [m async for m in guild.fetch_members(limit=None) if m.premium_since]
+        self.boosters = {m.id for m in members}
+        self.seeded = True
+
+    def update(self, member: discord.Member):
+        if member.premium_since:
+            self.boosters.add(member.id)
+        else:
+            self.boosters.discard(member.id)
+
+    def discard(self, user_id: int):
+        self.boosters.discard(user_id)
+
+    def is_booster(self, user_id: int) -> bool:
+        return user_id in self.boosters
+
+
+booster_registry = BoosterRegistry()
+
+
+# -------------------------------
+# Cooldown Manager
+# -------------------------------
+
 class BoosterCooldownManager:
-    def __init__(self, rate: int, per: float, bucket_type: Literal["user", "guild"] = "user"):
+    """GCRA cooldown: `rate` uses per `per` seconds, 30% shorter for boosters.
+
+    Each key stores a single "theoretical arrival time" float in the backend,
+    so a check is O(1) and keys whose TAT has passed are swept away.
+    """
+
+    def __init__(self, rate: int, per: float, bucket_type: Literal["user", "guild"] = "user",
+                 name: str = "default", backend=None):
         self.rate = rate
         self.per = per
         self.bucket_type = bucket_type
-        self.cooldowns = {}  # key -> [timestamps]
+        self.name = name
+        self.backend = backend or get_cooldown_backend("memory")
 
     def _get_key(self, interaction: discord.Interaction):
         return BUCKET_TYPES[self.bucket_type](interaction)
 
-    async def get_remaining(self, interaction: discord.Interaction) -> float:
-        key = self._get_key(interaction)
-        now = time.time()
-
-        # Get member for booster check
-        guild = interaction.client.get_guild(SUPPORT_SERVER_ID)
-        member = guild.get_member(interaction.user.id) if guild else None
-        cooldown_period = self.per * 0.7 if member and member.premium_since else self.per
+    def _get_period(self, interaction: discord.Interaction) -> float:
+        return self.per * 0.7 if booster_registry.is_booster(interaction.user.id) else self.per
 
-        timestamps = self.cooldowns.get(key, [])
-        # Filter timestamps still within cooldown period
-        valid = [t for t in timestamps if now - t < cooldown_period]
-        self.cooldowns[key] = valid
+    def _tolerance(self, period: float) -> float:
+        # Burst tolerance: the window fits `rate` uses before the next has to wait
+        return period - period / self.rate
 
-        if len(valid) >= self.rate:
-            return cooldown_period - (now - valid[0])
-        else:
+    async def get_remaining(self, interaction: discord.Interaction) -> float:
+        """Returns the seconds left on the cooldown without consuming a use."""
+        now = time.time()
+        period = self._get_period(interaction)
+        tat = await self.backend.peek(self.name, self._get_key(interaction), now)
+        if tat is None:
             return 0.0
+        return max(0.0, tat - self._tolerance(period) - now)
 
     async def trigger(self, interaction: discord.Interaction):
-        key = self._get_key(interaction)
-        now = time.time()
-        self.cooldowns.setdefault(key, []).append(now)
+        """Consumes one use unconditionally."""
+        period = self._get_period(interaction)
+        await self.backend.push(self.name, self._get_key(interaction), time.time(), period / self.rate)
+
+    async def acquire(self, interaction: discord.Interaction) -> float:
+        """Checks and consumes a use in one step.
+
+        Returns 0.0 when the use was granted, otherwise the seconds remaining.
+        The backend performs the check and the update atomically, so two
+        concurrent interactions for the same key cannot both pass.
+        """
+        period = self._get_period(interaction)
+        return await self.backend.acquire(
+            self.name, self._get_key(interaction), time.time(), period / self.rate, self._tolerance(period)
+        )
@@ -0,0 +1,73 @@
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    closed:    calls go through; `failure_threshold` failures in a row open it.
+    open:      calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    half_open: up to `half_open_max` probe calls go through; a success closes
+               the circuit, a failure opens it again for another timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.probes = 0
+        if self.state == self.HALF_OPEN:
+            if self.probes >= self.half_open_max:
+                self.rejected += 1
+                return False
+            self.probes += 1
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probes = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+    def retry_in(self) -> float:
+        """Seconds until the next half-open probe is allowed (0 unless open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    async def call(self, fn, *args):
+        """Awaits fn(*args) through the breaker; any exception counts as a failure."""
+        if not self.allow():
+            raise CircuitOpenError(f"circuit open, retry in {self.retry_in():.0f}s")
+        try:
+            result = await fn(*args)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
@@ -1,29 +1,108 @@
+import asyncio
 import json
 import os
+import threading
 import discord
 from functools import wraps
+from utils.atomic_file import atomic_write_json
+from utils.logger import log
+from utils.role_index import get_role_index
 
 CONFIG_FILE = "data/guildConf.json"
 
+# Process-wide cache of guildConf.json, loaded once on first access
+_config_cache = None
+_config_lock = threading.Lock()
+_write_lock = threading.Lock()
+_pending_save = None
+# Seconds before retrying a config save that failed
+SAVE_RETRY_DELAY = 5.0
+
+# Compiled command gates: guild id -> command name -> packed GATE_* flags
+GATE_DISABLED = 1
+GATE_DEV_ONLY = 2
+GATE_MAINTENANCE = 4
+_gate_table = {}
+_NO_GATES = {}
+# Called with a guild id whenever that guild's gates change (e.g. the sync scheduler)
+_gate_listeners = []
+
+GATE_MESSAGES = {
+    "no_guild": "This command can only be used in a server.",
+    GATE_MAINTENANCE: "🛠 This command is currently under maintenance.",
+    GATE_DISABLED: "❌ This command is disabled in this server.",
+    GATE_DEV_ONLY: "🚫 This command is restricted to bot developers.",
+}
+
 # -------------------------------
 # Core Configuration I/O
 # -------------------------------
 
-def load_config():
-    """Loads or creates the guildConf.json file."""
+def _read_config_file():
+    """Reads guildConf.json from disk, creating it if missing."""
     if not os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "w") as f:
-            json.dump({"Servers": {}}, f, indent=4)
+        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+        atomic_write_json(CONFIG_FILE, json.dumps({"Servers": {}}, indent=4))
     with open(CONFIG_FILE, "r") as f:
         return json.load(f)
 
-def save_config(config):
-    """Saves the current config to the file."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+def load_config():
+    """Returns the cached config, loading guildConf.json on first use."""
+    global _config_cache
+    if _config_cache is None:
+        with _config_lock:
+            if _config_cache is None:
+                _config_cache = ensure_guild_config_structure(_read_config_file())
+                rebuild_gate_table(_config_cache)
+    return _config_cache
+
+def reload_config():
+    """Drops the cache and re-reads guildConf.json from disk."""
+    global _config_cache
+    with _config_lock:
+        _config_cache = ensure_guild_config_structure(_read_config_file())
+        rebuild_gate_table(_config_cache)
+    return _config_cache
+
+def _snapshot_and_write():
+    # Snapshot and write under one lock so files land in mutation order
+    with _write_lock:
+        with _config_lock:
+            snapshot = json.dumps(_config_cache, indent=4)
+        atomic_write_json(CONFIG_FILE, snapshot)
+
+async def _flush_config():
+    global _pending_save
+    # Clear the marker first so mutations made during the write schedule another flush
+    _pending_save = None
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, _snapshot_and_write)
+    except Exception as e:
+        log(f"[CommandChecks] Failed to save {CONFIG_FILE}, retrying in {SAVE_RETRY_DELAY}s: {e}")
+        await asyncio.sleep(SAVE_RETRY_DELAY)
+        save_config()
+
+def save_config(config=None):
+    """Persists the cached config.
+
+    Inside a running event loop the write is scheduled off-loop and coalesced
+    with any save already pending; otherwise it is written immediately.
+    """
+    global _config_cache, _pending_save
+    if config is not None:
+        _config_cache = ensure_guild_config_structure(config)
+        rebuild_gate_table(_config_cache)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _snapshot_and_write()
+        return
+    if _pending_save is None:
+        _pending_save = loop.create_task(_flush_config())
 
 def ensure_guild_config_structure(config: dict) -> dict:
     """Ensures all guilds have DevOnly and UnderMaintenance keys."""
+    config.setdefault("Servers", {})
     for guild_id, guild_conf in config["Servers"].items():
         guild_conf.setdefault("DevOnly", {})
         guild_conf.setdefault("UnderMaintenance", {})
@@ -33,71 +112,140 @@ def ensure_guild_config_structure(config: dict) -> dict:
 # Guild Config Accessors
 # -------------------------------
 
-def get_guild_config(guild_id: int):
-    """Returns the guild's command settings, initializes if missing."""
-    config = load_config()
-    config = ensure_guild_config_structure(config)
+_EMPTY_GUILD_CONFIG = {"DevOnly": {}, "UnderMaintenance": {}}
 
-    if str(guild_id) not in config["Servers"]:
-        config["Servers"][str(guild_id)] = {"DevOnly": {}, "UnderMaintenance": {}}
-        save_config(config)
+def get_guild_config(guild_id: int):
+    """Returns the guild's command settings.
 
-    return config["Servers"][str(guild_id)]
+    Guilds without an entry get a shared read-only default; an entry is only
+    created (and persisted) once `toggle_command` changes something.
+    """
+    return load_config()["Servers"].get(str(guild_id), _EMPTY_GUILD_CONFIG)
 
 def is_command_enabled(guild_id: int, command_name: str) -> bool:
     """Checks if a command is enabled for the guild."""
-    guild_config = get_guild_config(guild_id)
-    if command_name in guild_config.get("UnderMaintenance", {}):
-        return False
-    return guild_config.get(command_name, True)
+    return not get_command_flags(guild_id, command_name) & GATE_DISABLED
 
 def toggle_command(guild_id: int, command_name: str, value: bool, category: str = "General"):
     """Enables or disables a command for the server with category handling."""
     config = load_config()
-    config = ensure_guild_config_structure(config)
 
-    if str(guild_id) not in config["Servers"]:
-        config["Servers"][str(guild_id)] = {"DevOnly": {}, "UnderMaintenance": {}}
+    with _config_lock:
+        guild_conf = config["Servers"].setdefault(str(guild_id), {"DevOnly": {}, "UnderMaintenance": {}})
+        if category == "DevOnly":
+            guild_conf["DevOnly"][command_name] = value
+        elif category == "UnderMaintenance":
+            guild_conf["UnderMaintenance"][command_name] = value
+        else:
+            guild_conf[command_name] = value
+        _gate_table[int(guild_id)] = _compile_guild_gates(guild_conf)
+
+    save_config()
+    _notify_gate_change(int(guild_id))
 
-    if category == "DevOnly":
-        config["Servers"][str(guild_id)]["DevOnly"][command_name] = value
-    elif category == "UnderMaintenance":
-        config["Servers"][str(guild_id)]["UnderMaintenance"][command_name] = value
-    else:
-        config["Servers"][str(guild_id)][command_name] = value
+# -------------------------------
+# Compiled Command Gates
+# -------------------------------
 
-    save_config(config)
+def _compile_guild_gates(guild_conf: dict) -> dict:
+    """Packs one guild's enabled/DevOnly/UnderMaintenance settings into flags."""
+    gates = {}
+    for name, value in guild_conf.items():
+        if name in ("DevOnly", "UnderMaintenance"):
+            continue
+        if not value:
+            gates[name] = gates.get(name, 0) | GATE_DISABLED
+    for name, value in guild_conf.get("DevOnly", {}).items():
+        if value:
+            gates[name] = gates.get(name, 0) | GATE_DEV_ONLY
+    for name, value in guild_conf.get("UnderMaintenance", {}).items():
+        # Any maintenance entry disables the command, matching is_command_enabled
+        flags = gates.get(name, 0) | GATE_DISABLED
+        if value:
+            flags |= GATE_MAINTENANCE
+        gates[name] = flags
+    return gates
 
-def update_commands_for_guild(bot: discord.Client, guild_id: int):
-    """Syncs the command tree with the server's settings."""
-    config = load_config()
-    config = ensure_guild_config_structure(config)
-    guild_config = get_guild_config(guild_id)
+def rebuild_gate_table(config: dict):
+    """Recompiles the gate table for every guild in the config."""
+    global _gate_table
+    previous = _gate_table
+    _gate_table = {
+        int(guild_id): _compile_guild_gates(guild_conf)
+        for guild_id, guild_conf in config["Servers"].items()
+    }
+    for guild_id in set(previous) | set(_gate_table):
+        if previous.get(guild_id) != _gate_table.get(guild_id):
+            _notify_gate_change(guild_id)
 
-    for cmd in bot.tree.get_commands():
-        if not is_command_enabled(guild_id, cmd.name):
-            bot.tree.remove_command(cmd.name)
-        else:
-            if cmd.name not in [command.name for command in bot.tree.commands]:
-                bot.tree.add_command(cmd)
+def add_gate_listener(callback):
+    """Registers callback(guild_id), run after a guild's gates change."""
+    if callback not in _gate_listeners:
+        _gate_listeners.append(callback)
+
+def _notify_gate_change(guild_id: int):
+    for callback in _gate_listeners:
+        try:
+            callback(guild_id)
+        except Exception as e:
+            log(f"[CommandChecks] Gate listener failed for guild {guild_id}: {e}")
+
+def get_command_flags(guild_id: int, command_name: str) -> int:
+    """Returns the packed gate flags for a command in a guild."""
+    if _config_cache is None:
+        load_config()
+    return _gate_table.get(guild_id, _NO_GATES).get(command_name, 0)
+
+def gate_denial(guild_id, command_name: str, dev_only: bool = False):
+    """Returns the denial message for a command, or None if it may run."""
+    if guild_id is None:
+        return GATE_MESSAGES["no_guild"]
+    flags = get_command_flags(guild_id, command_name)
+    if flags & GATE_MAINTENANCE:
+        return GATE_MESSAGES[GATE_MAINTENANCE]
+    if flags & GATE_DISABLED:
+        return GATE_MESSAGES[GATE_DISABLED]
+    if dev_only and not flags & GATE_DEV_ONLY:
+        return GATE_MESSAGES[GATE_DEV_ONLY]
+    return None
+
+def update_commands_for_guild(bot: discord.Client, guild_id: int) -> bool:
+    """Queues a command sync for the guild if its enabled set changed.
 
-    bot.tree.sync(guild=discord.Object(id=guild_id))
+    The global command tree is left untouched; see utils/command_sync.py.
+    """
+    from utils.command_sync import get_sync_scheduler
+    return get_sync_scheduler(bot).schedule(guild_id)
 
 # -------------------------------
 # Decorators
 # -------------------------------
 
+def command_gate(dev_only: bool = False):
+    """Checks enabled, maintenance and (optionally) DevOnly state in one lookup."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            # Toggles are keyed by the slash command name, not the callback's
+            name = interaction.command.name if interaction.command else func.__name__
+            denial = gate_denial(interaction.guild_id, name, dev_only)
+            if denial:
+                return await interaction.response.send_message(denial, ephemeral=True)
+            return await func(self, interaction, *args, **kwargs)
+        return wrapper
+    return decorator
+
 def command_enabled():
     def decorator(func):
         @wraps(func)
         async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
             if interaction.guild_id is None:
                 return await interaction.response.send_message(
-                    "This command can only be used in a server.", ephemeral=True
+                    GATE_MESSAGES["no_guild"], ephemeral=True
                 )
-            if not is_command_enabled(interaction.guild_id, func.__name__):
+            if get_command_flags(interaction.guild_id, func.__name__) & GATE_DISABLED:
                 return await interaction.response.send_message(
-                    "❌ This command is disabled in this server.", ephemeral=True
+                    GATE_MESSAGES[GATE_DISABLED], ephemeral=True
                 )
             return await func(self, interaction, *args, **kwargs)
         return wrapper
@@ -107,10 +255,9 @@ def dev_only_command():
     def decorator(func):
         @wraps(func)
         async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
-            config = get_guild_config(interaction.guild_id)
-            if not config.get("DevOnly", {}).get(func.__name__, False):
+            if not get_command_flags(interaction.guild_id, func.__name__) & GATE_DEV_ONLY:
                 return await interaction.response.send_message(
-                    "🚫 This command is restricted to bot developers.", ephemeral=True
+                    GATE_MESSAGES[GATE_DEV_ONLY], ephemeral=True
                 )
             return await func(self, interaction, *args, **kwargs)
         return wrapper
@@ -120,10 +267,9 @@ def maintenance_mode():
     def decorator(func):
         @wraps(func)
         async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
-            config = get_guild_config(interaction.guild_id)
-            if config.get("UnderMaintenance", {}).get(func.__name__, False):
+            if get_command_flags(interaction.guild_id, func.__name__) & GATE_MAINTENANCE:
                 return await interaction.response.send_message(
-                    "🛠 This command is currently under maintenance.", ephemeral=True
+                    GATE_MESSAGES[GATE_MAINTENANCE], ephemeral=True
                 )
             return await func(self, interaction, *args, **kwargs)
         return wrapper
@@ -142,7 +288,7 @@ def role_required(role_name: str):
             if not member:
                 return await interaction.response.send_message("Member not found.", ephemeral=True)
 
-            if not any(role.name == role_name for role in member.roles):
+            if not get_role_index(interaction.client).has_role_name(member, role_name):
                 return await interaction.response.send_message(
                     f"❌ You need the `{role_name}` role to use this command.", ephemeral=True
                 )
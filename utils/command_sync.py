@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import traceback
+import discord
+from utils.command_checks import add_gate_listener, is_command_enabled
+from utils.logger import log
+from utils.persistent_dict import PersistentDict
+
+# Per-guild hashes of the last synced command sets, kept next to guildConf.json
+SYNC_STATE_FILE = "data/commandSync.json"
+
+# Wait this long after the first queued change so bursts of toggles share one pass
+COALESCE_DELAY = 2.0
+# Minimum spacing between two guild syncs (bulk overwrite is rate limited per route)
+SYNC_INTERVAL = 1.0
+
+
+class CommandSyncScheduler:
+    """Queues per-guild command syncs and flushes them in rate-limited batches.
+
+    Commands are registered guild-only: each guild gets its own copy of the
+    commands it has enabled, and nothing is synced globally (`sync_all`
+    clears any old global registration), so a disabled command is really
+    gone from that guild. The global `bot.tree` is only read as the
+    template. A guild is synced again only when the hash of its command
+    payloads changes; the hashes are persisted so a restart only syncs the
+    guilds whose set actually changed.
+    """
+
+    def __init__(self, bot: discord.Client, path: str = SYNC_STATE_FILE):
+        self.bot = bot
+        self.state = PersistentDict(path, default={"global_cleared": False, "guilds": {}})
+        self.synced_hashes = self.state["guilds"]  # str(guild_id) -> hash of last synced command set
+        self.pending = set()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Queued before the bot started; sync_all starts the worker
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.state.close()
+
+    async def sync_all(self) -> int:
+        """Clears global registrations and queues every guild whose set changed."""
+        if not self.state["global_cleared"] and self.bot.application_id:
+            try:
+                await self.bot.http.bulk_upsert_global_commands(self.bot.application_id, [])
+                self.state["global_cleared"] = True
+            except discord.HTTPException as e:
+                log(f"[CommandSync] Failed to clear global commands: {e}")
+        # Guilds left while the bot was offline are synced again if it rejoins
+        current = {str(guild.id) for guild in self.bot.guilds}
+        for guild_id in [g for g in self.synced_hashes if g not in current]:
+            self.forget(int(guild_id))
+        queued = 0
+        for guild in self.bot.guilds:
+            # Unchanged guilds still need their local copies for dispatch
+            self._copy_local(guild.id, self.effective_commands(guild.id))
+            queued += self.schedule(guild.id)
+        if self.pending:
+            self.start()
+            self._wakeup.set()
+        return queued
+
+    def refresh_local_copies(self):
+        """Re-copies commands into each synced guild's scope after a cog reload.
+
+        Reloaded cogs register new command objects in the global tree; the
+        guild copies must point at them. Payloads are unchanged, so nothing
+        is re-synced with Discord.
+        """
+        for guild_id in self.synced_hashes:
+            self._copy_local(int(guild_id), self.effective_commands(int(guild_id)))
+
+    def _copy_local(self, guild_id: int, commands):
+        guild = discord.Object(id=guild_id)
+        tree = self.bot.tree
+        tree.clear_commands(guild=guild)
+        for cmd in commands:
+            tree.add_command(cmd, guild=guild, override=True)
+
+    def effective_commands(self, guild_id: int):
+        return [cmd for cmd in self.bot.tree.get_commands() if is_command_enabled(guild_id, cmd.name)]
+
+    def _payload(self, cmd) -> dict:
+        try:
+            return cmd.to_dict(self.bot.tree)  # discord.py >= 2.4
+        except TypeError:
+            return cmd.to_dict()
+
+    def _hash_commands(self, commands) -> str:
+        # Hash the full payloads so changed options or descriptions re-sync too
+        payloads = sorted((self._payload(cmd) for cmd in commands), key=lambda p: p["name"])
+        return hashlib.sha1(json.dumps(payloads, sort_keys=True, default=str).encode()).hexdigest()
+
+    def schedule(self, guild_id: int, force: bool = False):
+        """Queues a guild if its effective command set differs from the last sync."""
+        if force:
+            self.synced_hashes.pop(str(guild_id), None)
+            self.state.mark_dirty()
+        digest = self._hash_commands(self.effective_commands(guild_id))
+        if self.synced_hashes.get(str(guild_id)) == digest:
+            self.pending.discard(guild_id)
+            return False
+        self.pending.add(guild_id)
+        self.start()
+        self._wakeup.set()
+        return True
+
+    def forget(self, guild_id: int):
+        """Drops a guild the bot left, so a later rejoin syncs it from scratch."""
+        self.pending.discard(guild_id)
+        if self.synced_hashes.pop(str(guild_id), None) is not None:
+            self.state.mark_dirty()
+        self.bot.tree.clear_commands(guild=discord.Object(id=guild_id))
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(COALESCE_DELAY)
+            self._wakeup.clear()
+            batch, self.pending = self.pending, set()
+            for guild_id in batch:
+                try:
+                    await self._sync_guild(guild_id)
+                except Exception as e:
+                    # One bad guild must not kill the scheduler
+                    log(f"[CommandSync] Unexpected error syncing guild {guild_id}: {e}")
+                    traceback.print_exc()
+                await asyncio.sleep(SYNC_INTERVAL)
+
+    async def _sync_guild(self, guild_id: int):
+        # Recompute at flush time, later toggles may have landed while queued
+        commands = self.effective_commands(guild_id)
+        digest = self._hash_commands(commands)
+        if self.synced_hashes.get(str(guild_id)) == digest:
+            return
+
+        self._copy_local(guild_id, commands)
+        try:
+            await self.bot.tree.sync(guild=discord.Object(id=guild_id))
+            self.synced_hashes[str(guild_id)] = digest
+            self.state.mark_dirty()
+        except discord.HTTPException as e:
+            if e.status == 429:
+                retry_after = float(e.response.headers.get("Retry-After", 5.0))
+                log(f"[CommandSync] Rate limited, retrying guild {guild_id} in {retry_after}s")
+                await asyncio.sleep(retry_after)
+                self.pending.add(guild_id)
+                self._wakeup.set()
+            else:
+                log(f"[CommandSync] Failed to sync guild {guild_id}: {e}")
+
+
+def get_sync_scheduler(bot: discord.Client) -> CommandSyncScheduler:
+    """Returns the bot's shared sync scheduler, creating it on first use."""
+    scheduler = getattr(bot, "command_sync", None)
+    if scheduler is None:
+        scheduler = CommandSyncScheduler(bot)
+        bot.command_sync = scheduler
+        # Toggles and config reloads queue the affected guilds
+        add_gate_listener(scheduler.schedule)
+    return scheduler
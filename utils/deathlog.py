@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from utils.persistent_dict import PersistentDict
+from utils.random_set import RandomSet
+
+
+def entry_key(guild_id, user_id) -> str:
+    return f"{guild_id}:{user_id}"
+
+
+class GuildKnockouts(RandomSet):
+    """Knocked-out user ids for one guild with O(1) add, remove and random pick."""
+
+    def __init__(self):
+        super().__init__()
+        self.expires = {}  # user_id -> expires_at
+
+    def add(self, user_id: int, expires_at: float):
+        super().add(user_id)
+        self.expires[user_id] = expires_at
+
+    def remove(self, user_id: int):
+        self.expires.pop(user_id, None)
+        return super().remove(user_id)
+
+    def is_knocked_out(self, user_id: int, now: float = None) -> bool:
+        expires_at = self.expires.get(user_id)
+        return expires_at is not None and expires_at > (time.time() if now is None else now)
+
+
+class DeathLog:
+    """Knocked-out members keyed by guild and user, expired by a timer heap.
+
+    Entries carry their guild id and a parsed `expires_at` timestamp. A
+    min-heap of (expires_at, key) lets the expiry task sleep until exactly
+    the next expiry, so it does O(log n) work per expiry and nothing while
+    idle. Heap entries are invalidated lazily: a popped item whose entry was
+    removed or re-added with a new expiry is simply skipped.
+
+    `by_guild` indexes the same entries per guild, so revive targeting only
+    ever looks at the invoking guild's knockouts.
+    """
+
+    def __init__(self, path: str):
+        self.entries = PersistentDict(path)
+        self._heap = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.by_guild = {}  # guild_id -> GuildKnockouts
+        self._migrate_legacy()
+        for key, entry in self.entries.items():
+            self._heap.append((entry["expires_at"], key))
+            self._index(entry)
+        heapq.heapify(self._heap)
+
+    def _index(self, entry: dict):
+        if entry.get("guild_id") is None:
+            return  # legacy entries have no guild and just age out
+        self.by_guild.setdefault(entry["guild_id"], GuildKnockouts()).add(entry["user_id"], entry["expires_at"])
+
+    def _unindex(self, entry: dict):
+        bucket = self.by_guild.get(entry.get("guild_id"))
+        if bucket is None:
+            return
+        bucket.remove(entry["user_id"])
+        if not bucket:
+            del self.by_guild[entry["guild_id"]]
+
+    def _migrate_legacy(self):
+        """Upgrades entries from the old user-id-only format."""
+        for key in [k for k in self.entries if ":" not in k]:
+            entry = dict(self.entries.pop(key))
+            try:
+                entry["expires_at"] = datetime.fromisoformat(entry["timeout_end"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            entry.setdefault("guild_id", None)
+            entry["user_id"] = int(key)
+            self.entries[entry_key(entry["guild_id"], key)] = entry
+
+    # === Mapping helpers ===
+    def get(self, guild_id, user_id):
+        return self.entries.get(entry_key(guild_id, user_id)) or self.entries.get(entry_key(None, user_id))
+
+    def add(self, guild_id: int, user_id: int, by: int, weapon: str, timeout_end: datetime, crit: bool):
+        key = entry_key(guild_id, user_id)
+        expires_at = timeout_end.timestamp()
+        entry = {
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "by": by,
+            "weapon": weapon,
+            "timeout_end": timeout_end.isoformat(),
+            "expires_at": expires_at,
+            "crit": crit
+        }
+        self.entries[key] = entry
+        self._index(entry)
+        heapq.heappush(self._heap, (expires_at, key))
+        # Wake the timer if this entry now expires first
+        if self._heap[0][1] == key:
+            self._wakeup.set()
+
+    def remove(self, guild_id, user_id):
+        entry = self.entries.pop(entry_key(guild_id, user_id), None)
+        if entry is None:
+            entry = self.entries.pop(entry_key(None, user_id), None)
+        if entry is not None:
+            self._unindex(entry)
+        return entry
+
+    def is_knocked_out(self, guild_id: int, user_id: int) -> bool:
+        bucket = self.by_guild.get(guild_id)
+        return bucket is not None and bucket.is_knocked_out(user_id)
+
+    def random_knocked_out(self, guild_id: int):
+        """Returns a random knocked-out user id in the guild, or None."""
+        bucket = self.by_guild.get(guild_id)
+        return bucket.random() if bucket else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    # === Expiry ===
+    def pop_expired(self, now: float = None):
+        """Removes and returns every entry whose expiry has passed."""
+        now = time.time() if now is None else now
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            entry = self.entries.get(key)
+            if entry is None or entry["expires_at"] != expires_at:
+                continue  # stale heap item
+            entry = self.entries.pop(key)
+            self._unindex(entry)
+            expired.append(entry)
+        return expired
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            expired = self.pop_expired()
+            if expired:
+                print(f"[Royale] Expired {len(expired)} entries from deathlog.")
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.entries.close()
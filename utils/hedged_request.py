@@ -0,0 +1,56 @@
+import asyncio
+import time
+from collections import deque
+
+# Samples needed before hedging starts; until then requests are never duplicated
+MIN_SAMPLES = 20
+
+
+class LatencyWindow:
+    """Rolling window of recent request latencies (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float):
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def hedged(fn, delay, latency: LatencyWindow = None):
+    """Awaits fn(); if it hasn't answered after `delay` seconds, races a second fn().
+
+    The first attempt to succeed wins and the other is cancelled. If one
+    attempt fails the other is still awaited; the error is raised once every
+    attempt sent has failed (a fast failure is not hedged).
+
+    `delay=None` disables the hedge. Every call's latency is recorded into
+    `latency`, failures included, so a slow failing API raises the p95.
+    """
+    started = time.monotonic()
+    pending = {asyncio.ensure_future(fn())}
+    hedge_sent = delay is None
+    error = None
+    try:
+        while pending:
+            timeout = None if hedge_sent else max(0.0, delay - (time.monotonic() - started))
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not hedge_sent and not done:
+                # First attempt is slower than the hedge delay: send the hedge now
+                pending.add(asyncio.ensure_future(fn()))
+                hedge_sent = True
+        raise error
+    finally:
+        if latency is not None:
+            latency.record(time.monotonic() - started)
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Optional
+import aiohttp
+import discord
+from utils.models import loads
+
+# Connection pool
+POOL_LIMIT = 100
+PER_HOST_LIMIT = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# Timeouts (seconds)
+TOTAL_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+
+
+class HttpClient:
+    """One pooled aiohttp session shared by every cog.
+
+    The session (and its TCPConnector) is created on first use inside the
+    running loop and reused afterwards, so repeated API lookups keep their
+    DNS entry, TCP connection and TLS session instead of rebuilding them per
+    request.
+    """
+
+    def __init__(self, gzip: bool = True, user_agent: str = "Hexbyte (discord.py)"):
+        self.gzip = gzip
+        self.user_agent = user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=PER_HOST_LIMIT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        timeout = aiohttp.ClientTimeout(total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate" if self.gzip else "identity",
+        }
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    self._session = self._create_session()
+        return self._session
+
+    async def get_json(self, url: str, **kwargs):
+        """GETs `url` and returns (status, json); json is None for non-200 responses."""
+        session = await self.session()
+        async with session.get(url, **kwargs) as resp:
+            if resp.status != 200:
+                return resp.status, None
+            return resp.status, loads(await resp.read())
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def get_http_client(bot: discord.Client) -> HttpClient:
+    """Returns the bot's shared HTTP client, creating it on first use."""
+    client = getattr(bot, "http_client", None)
+    if client is None:
+        client = HttpClient()
+        bot.http_client = client
+    return client
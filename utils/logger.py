@@ -0,0 +1,6 @@
+from datetime import datetime
+
+
+def log(message: str):
+    time = datetime.now().strftime("%H:%M:%S")
+    print(f"[{time}] {message}")
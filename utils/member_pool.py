@@ -0,0 +1,68 @@
+import random
+from typing import Callable, Optional
+import discord
+from utils.random_set import RandomSet
+
+# Random picks tried before giving up on finding a valid target
+MAX_SAMPLE_ATTEMPTS = 16
+
+
+class MemberPool:
+    """Per-guild pool of non-bot member ids eligible as random targets.
+
+    Seeded from the member cache the first time a guild is sampled, then
+    kept current from join/remove events. Sampling is O(1) per attempt,
+    rejecting the caller and anyone already timed out.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # guild_id -> RandomSet of member ids
+
+    def _pool(self, guild: discord.Guild) -> RandomSet:
+        pool = self.guilds.get(guild.id)
+        if pool is None:
+            pool = self.guilds[guild.id] = RandomSet(m.id for m in guild.members if not m.bot)
+        return pool
+
+    def add(self, member: discord.Member):
+        if not member.bot and member.guild.id in self.guilds:
+            self.guilds[member.guild.id].add(member.id)
+
+    def remove(self, guild_id: int, member_id: int):
+        pool = self.guilds.get(guild_id)
+        if pool is not None:
+            pool.remove(member_id)
+
+    def forget_guild(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+
+    def sample(self, guild: discord.Guild, exclude_id: int = None,
+               reject: Callable[[discord.Member], bool] = None, rng=random) -> Optional[discord.Member]:
+        """Returns a random eligible member, or None if there is none.
+
+        Tries O(1) random picks first; if they all miss (tiny or mostly
+        ineligible pools), falls back to one scan of the pool so a valid
+        target is never reported as missing.
+        """
+        pool = self._pool(guild)
+
+        def eligible(member_id):
+            if member_id == exclude_id:
+                return None
+            member = guild.get_member(member_id)
+            if member is None:
+                pool.remove(member_id)  # left while we weren't watching
+                return None
+            if member.is_timed_out() or (reject and reject(member)):
+                return None
+            return member
+
+        for _ in range(MAX_SAMPLE_ATTEMPTS):
+            if not len(pool):
+                return None
+            member = eligible(pool.random(rng))
+            if member is not None:
+                return member
+
+        candidates = [m for m in map(eligible, list(pool)) if m is not None]
+        return rng.choice(candidates) if candidates else None
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+import discord
+
+# Attempts per action before giving up on repeated 429s
+MAX_ATTEMPTS = 3
+# Drop a guild's idle worker after this many seconds without work
+IDLE_TIMEOUT = 60.0
+
+
+def _retry_after(e: discord.HTTPException, default: float = 1.0) -> float:
+    headers = getattr(e.response, "headers", None) or {}
+    for header in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return float(headers[header])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return default
+
+
+class GuildActionQueue:
+    """Serializes one guild's moderation actions and tracks its bucket.
+
+    discord.py already reads X-RateLimit-Remaining on every response and
+    pauses pre-emptively, so this queue only waits when Discord has actually
+    answered 429 for the guild's member route, and only until that bucket
+    resets. Successful actions return immediately with no fixed sleep.
+    """
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.queue = asyncio.Queue()
+        self.blocked_until = 0.0  # monotonic time the exhausted bucket resets
+        self.worker = None
+
+    def submit(self, member: discord.Member, until: Optional[datetime], reason: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((member, until, reason, future))
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+        return future
+
+    async def _run(self):
+        while True:
+            try:
+                member, until, reason, future = await asyncio.wait_for(self.queue.get(), timeout=IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # An action may have been submitted while the wait was timing out
+                if self.queue.empty():
+                    return
+                continue
+            if future.cancelled():
+                continue
+            try:
+                result = await self._apply(member, until, reason)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            if not future.done():
+                future.set_result(result)
+
+    async def _apply(self, member: discord.Member, until: Optional[datetime], reason: str):
+        for attempt in range(MAX_ATTEMPTS):
+            wait = self.blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                # discord.Member.timeout accepts None to clear timeout
+                await member.timeout(until, reason=reason)
+                return True, None
+            except discord.Forbidden:
+                return False, "forbidden"
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    return False, str(e)
+                self.blocked_until = time.monotonic() + _retry_after(e)
+            except Exception as e:
+                return False, str(e)
+        return False, "rate_limited"
+
+    def close(self):
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+        # Nothing will apply the queued actions now; don't leave callers waiting
+        while not self.queue.empty():
+            *_, future = self.queue.get_nowait()
+            future.cancel()
+
+
+class ModerationQueue:
+    """Per-guild moderation action queues (timeouts and their removal)."""
+
+    def __init__(self):
+        self.guilds = {}  # guild_id -> GuildActionQueue
+
+    def _queue(self, guild_id: int) -> GuildActionQueue:
+        queue = self.guilds.get(guild_id)
+        if queue is None:
+            queue = self.guilds[guild_id] = GuildActionQueue(guild_id)
+        return queue
+
+    async def timeout(self, member: discord.Member, until: Optional[datetime], reason: str):
+        """Queues a timeout (or its removal when `until` is None).
+
+        Resolves to (ok, error) as soon as Discord has applied it; error is
+        None, "forbidden", "rate_limited" or the HTTP error text.
+        """
+        return await self._queue(member.guild.id).submit(member, until, reason)
+
+    def close(self):
+        for queue in self.guilds.values():
+            queue.close()
+        self.guilds.clear()
@@ -0,0 +1,210 @@
+"""Typed, slotted views of the WTF stats API and the bundled data files.
+
+Payloads are decoded with orjson (stdlib json when it isn't installed) and
+validated once here, at the boundary. Missing fields get their defaults and
+numbers are coerced, so cogs and image code read plain attributes instead of
+repeating `.get(..., 0)` chains.
+"""
+from pathlib import Path
+from typing import Optional
+
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def loads(data):
+        return json.loads(data)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# weaponroyal.json defaults
+DEFAULT_WEIGHT = 100
+DEFAULT_TIMEOUT = 30
+
+
+def load_file(path):
+    """Decodes a JSON file, resolving bare data/ paths against the repo root."""
+    path = Path(path)
+    if not path.is_absolute() and not path.exists() and (ROOT / path).exists():
+        path = ROOT / path
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def _int(value, field: str, default: int = 0) -> int:
+    if value is None or value == "":
+        return default
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: expected a number, got {value!r}") from None
+
+
+def _float(value, field: str, default: Optional[float] = None) -> Optional[float]:
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: expected a number, got {value!r}") from None
+
+
+def _number(value, field: str):
+    """Like _float, but keeps JSON integers as ints so they display as written."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return _float(value, field)
+
+
+def _lines(value, field: str, default: tuple) -> tuple:
+    if value is None:
+        return default
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{field}: expected a list of strings")
+    return tuple(value) or default
+
+
+class PlayerStats:
+    """One player's row from the stats API (`playerStats?steamID=`)."""
+
+    __slots__ = (
+        "steam_id", "name", "level", "xp", "kills", "deaths", "assists",
+        "shots_fired", "shots_hit", "matches", "wins", "losses",
+        "damage_dealt", "damage_taken", "score", "last_updated",
+    )
+
+    # attribute -> API field
+    FIELDS = {
+        "level": "Level", "xp": "TotalXP", "kills": "TotalKills", "deaths": "TotalDeaths",
+        "assists": "TotalAssists", "shots_fired": "TotalShotsFired", "shots_hit": "TotalShotsHit",
+        "matches": "TotalMatches", "wins": "MatchesWon", "losses": "MatchesLost",
+        "damage_dealt": "TotalDamageDealt", "damage_taken": "TotalDamageTaken", "score": "TotalScore",
+    }
+
+    def __init__(self, raw: dict, steam_id: str = ""):
+        for attr, field in self.FIELDS.items():
+            setattr(self, attr, _int(raw.get(field), field))
+        self.steam_id = str(raw.get("SteamID") or steam_id)
+        self.name = str(raw.get("PlayerName") or self.steam_id or "Unknown")
+        self.last_updated = str(raw.get("LastUpdated") or "Unknown")
+
+    @classmethod
+    def from_api(cls, payload, steam_id: str = "") -> Optional["PlayerStats"]:
+        """Builds stats from a decoded response; the API wraps single players in a list."""
+        if isinstance(payload, list):
+            payload = payload[0] if payload else None
+        if not isinstance(payload, dict):
+            return None
+        return cls(payload, steam_id)
+
+    @classmethod
+    def from_api_list(cls, payload) -> list:
+        if not isinstance(payload, list):
+            return []
+        return [cls(row) for row in payload if isinstance(row, dict)]
+
+    @property
+    def kd(self):
+        # Plain kill count when there are no deaths, so it displays as "150" not "150.0"
+        return round(self.kills / self.deaths, 2) if self.deaths > 0 else self.kills
+
+    @property
+    def accuracy(self) -> float:
+        return round(self.shots_hit / self.shots_fired * 100, 1) if self.shots_fired > 0 else 0.0
+
+
+class WeaponStats:
+    """One entry of data/weapons.json `WeaponStats`."""
+
+    __slots__ = (
+        "id", "name", "base_damage", "fire_rate", "magazine", "pellets",
+        "movement_speed", "ads_speed", "loaded_reload_speed", "empty_reload_speed",
+        "equip_speed", "bullet_velocity", "maximum_range", "image",
+    )
+
+    # Optional handling stats shown under "Other": (attribute, JSON field)
+    OTHER = (
+        ("movement_speed", "MovementSpeed"), ("ads_speed", "ADSSpeed"),
+        ("loaded_reload_speed", "LoadedReloadSpeed"), ("empty_reload_speed", "EmptyReloadSpeed"),
+        ("equip_speed", "EquipSpeed"), ("bullet_velocity", "BulletVelocity"), ("maximum_range", "MaximumRange"),
+    )
+
+    def __init__(self, wid: int, raw: dict):
+        self.id = wid
+        self.name = str(raw.get("Name") or f"Weapon {wid}")
+        self.base_damage = _number(raw.get("BaseDamage"), "BaseDamage")
+        self.fire_rate = _number(raw.get("FireRate"), "FireRate")
+        self.magazine = _number(raw.get("MaxMagazineAmmo"), "MaxMagazineAmmo")
+        self.pellets = _number(raw.get("PelletsPerCartridge"), "PelletsPerCartridge")
+        for attr, field in self.OTHER:
+            setattr(self, attr, _number(raw.get(field), field))
+        self.image = next((raw[k] for k in ("SideImage", "Image", "Thumbnail") if raw.get(k)), None)
+
+    @classmethod
+    def load(cls, path="data/weapons.json") -> dict:
+        """Returns {weapon_id: WeaponStats}."""
+        data = load_file(path)
+        raw = data.get("WeaponStats", {}) if isinstance(data, dict) else {}
+        return {int(k): cls(int(k), v) for k, v in raw.items()}
+
+
+class RoyaleWeapon:
+    """One /waifufights weapon from data/weaponroyal.json."""
+
+    __slots__ = ("key", "title", "timeouts", "xp_multiplier", "weight", "gif", "lines", "crit_lines", "miss_lines")
+
+    def __init__(self, key: str, raw: dict):
+        self.key = key
+        self.title = str(raw.get("title") or "Knockout")
+        timeout = raw.get("timeout")
+        values = timeout if isinstance(timeout, list) else [timeout]
+        # Non-numeric timeouts (e.g. "last_5_chatters") fall back to the default
+        self.timeouts = tuple(int(v) if str(v).isdigit() else DEFAULT_TIMEOUT for v in values)
+        self.xp_multiplier = _float(raw.get("xp_multiplier"), f"{key}.xp_multiplier", 1.0)
+        self.weight = _float(raw.get("weight"), f"{key}.weight", DEFAULT_WEIGHT)
+        self.gif = str(raw.get("gif") or "")
+        self.lines = _lines(raw.get("lines"), f"{key}.lines", ("Hit!",))
+        self.crit_lines = _lines(raw.get("crit_lines"), f"{key}.crit_lines", ("Critical hit!",))
+        self.miss_lines = _lines(raw.get("miss_lines"), f"{key}.miss_lines", ("They missed!",))
+
+    @classmethod
+    def load(cls, path="data/weaponroyal.json") -> dict:
+        """Returns {weapon_key: RoyaleWeapon}."""
+        data = load_file(path)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object of weapons")
+        return {key: cls(key, raw) for key, raw in data.items()}
+
+
+class LevelTable:
+    """data/levels.json: total XP per level plus the XP rewards table."""
+
+    __slots__ = ("levels", "xp_rewards")
+
+    def __init__(self, raw: dict):
+        self.levels = {int(k): _int(v, f"levels.{k}") for k, v in (raw.get("levels") or {}).items()}
+        self.xp_rewards = {}
+        for k, v in (raw.get("XPRewards") or {}).items():
+            try:
+                self.xp_rewards[k] = int(v)
+            except (TypeError, ValueError):
+                self.xp_rewards[k] = v
+
+    @classmethod
+    def load(cls, path="data/levels.json") -> "LevelTable":
+        data = load_file(path)
+        return cls(data if isinstance(data, dict) else {})
+
+    def xp_for(self, level: int):
+        return self.levels.get(level)
+
+    def reward_for(self, key: str):
+        return self.xp_rewards.get(key)
+
+    @property
+    def max_level(self) -> int:
+        return max(self.levels) if self.levels else 0
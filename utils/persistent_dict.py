@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+from collections.abc import MutableMapping
+from utils.atomic_file import atomic_write_json
+from utils.logger import log
+
+# Default write-behind interval (seconds)
+FLUSH_INTERVAL = 5.0
+
+
+class PersistentDict(MutableMapping):
+    """A JSON-backed dict with write-behind persistence.
+
+    Mutations only mark the mapping dirty; a background task writes at most
+    once per `interval` via a temp file and os.replace in an executor, so a
+    burst of N changes costs one write and a crash can't leave a truncated
+    file. Call `mark_dirty()` after mutating a nested value in place, and
+    `close()` on unload/shutdown to force the final flush.
+    """
+
+    def __init__(self, path: str, default: dict = None, interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.dirty = False
+        self._task = None
+        self._write_lock = asyncio.Lock()
+        self.data = self._load(default or {})
+
+    def _load(self, default: dict) -> dict:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not os.path.exists(self.path):
+            atomic_write_json(self.path, json.dumps(default, indent=4))
+            return dict(default)
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    # === Mapping protocol ===
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.mark_dirty()
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.mark_dirty()
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    # === Persistence ===
+    def mark_dirty(self):
+        self.dirty = True
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # No running loop (import time / scripts): write through
+                self.flush_sync()
+
+    async def _flush_later(self):
+        # Changes made while a write is in flight find this task still running
+        # and schedule nothing, so keep going until the data is clean
+        while self.dirty:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Still dirty: retried after the next interval
+                log(f"[PersistentDict] Failed to write {self.path}: {e}")
+
+    def flush_sync(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        atomic_write_json(self.path, json.dumps(self.data, indent=4))
+
+    async def flush(self):
+        if not self.dirty:
+            return
+        async with self._write_lock:
+            # Serialize on the loop so the snapshot is consistent, write off-loop
+            self.dirty = False
+            payload = json.dumps(self.data, indent=4)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, atomic_write_json, self.path, payload)
+            except Exception:
+                self.dirty = True
+                raise
+
+    async def close(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        await self.flush()
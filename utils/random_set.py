@@ -0,0 +1,39 @@
+import random
+
+
+class RandomSet:
+    """A set of ids with O(1) add, remove and uniform random pick."""
+
+    def __init__(self, items=()):
+        self.ids = []
+        self.pos = {}  # id -> index into ids
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self.pos:
+            self.pos[item] = len(self.ids)
+            self.ids.append(item)
+
+    def remove(self, item):
+        index = self.pos.pop(item, None)
+        if index is None:
+            return False
+        # Swap the last id into the hole so removal stays O(1)
+        last = self.ids.pop()
+        if last != item:
+            self.ids[index] = last
+            self.pos[last] = index
+        return True
+
+    def random(self, rng=random):
+        return self.ids[int(rng.random() * len(self.ids))] if self.ids else None
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
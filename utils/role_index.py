@@ -0,0 +1,92 @@
+import discord
+
+# Roles that unlock developer-only options (dashboard extras, /update commands)
+DEV_ROLE_IDS = frozenset({954135885392252940})
+
+
+class RoleIndex:
+    """Per-guild index of role names/IDs and member role sets.
+
+    Kept current by the RoleIndexEvents cog from role and member update
+    events, so permission checks are set-membership tests instead of scans
+    over `member.roles`.
+    """
+
+    def __init__(self):
+        self.names = {}    # guild_id -> role name -> set of role ids
+        self.members = {}  # guild_id -> member_id -> frozenset of role ids
+
+    # === Role table ===
+    def index_guild(self, guild: discord.Guild):
+        names = {}
+        for role in guild.roles:
+            names.setdefault(role.name, set()).add(role.id)
+        self.names[guild.id] = names
+        # Member role sets may have gone stale (e.g. missed events across a
+        # reconnect); they are rebuilt lazily on the next check
+        self.members.pop(guild.id, None)
+
+    def add_role(self, role: discord.Role):
+        self.names.setdefault(role.guild.id, {}).setdefault(role.name, set()).add(role.id)
+
+    def remove_role(self, role: discord.Role):
+        ids = self.names.get(role.guild.id, {}).get(role.name)
+        if ids:
+            ids.discard(role.id)
+            if not ids:
+                self.names[role.guild.id].pop(role.name, None)
+
+    def delete_role(self, role: discord.Role):
+        self.remove_role(role)
+        guild_members = self.members.get(role.guild.id, {})
+        for member_id, role_ids in guild_members.items():
+            if role.id in role_ids:
+                guild_members[member_id] = role_ids - {role.id}
+
+    def rename_role(self, before: discord.Role, after: discord.Role):
+        self.remove_role(before)
+        self.add_role(after)
+
+    def forget_guild(self, guild_id: int):
+        self.names.pop(guild_id, None)
+        self.members.pop(guild_id, None)
+
+    # === Member table ===
+    def update_member(self, member: discord.Member):
+        self.members.setdefault(member.guild.id, {})[member.id] = frozenset(role.id for role in member.roles)
+
+    def remove_member(self, guild_id: int, member_id: int):
+        self.members.get(guild_id, {}).pop(member_id, None)
+
+    def member_roles(self, member: discord.Member) -> frozenset:
+        guild_members = self.members.setdefault(member.guild.id, {})
+        role_ids = guild_members.get(member.id)
+        if role_ids is None:
+            # First sighting of this member: index it once, events keep it fresh
+            role_ids = guild_members[member.id] = frozenset(role.id for role in member.roles)
+        return role_ids
+
+    # === Checks ===
+    def has_role_id(self, member: discord.Member, role_id: int) -> bool:
+        return role_id in self.member_roles(member)
+
+    def has_any_role_id(self, member: discord.Member, role_ids) -> bool:
+        return not self.member_roles(member).isdisjoint(role_ids)
+
+    def has_role_name(self, member: discord.Member, role_name: str) -> bool:
+        if member.guild.id not in self.names:
+            self.index_guild(member.guild)
+        ids = self.names[member.guild.id].get(role_name)
+        return bool(ids) and not self.member_roles(member).isdisjoint(ids)
+
+    def is_dev(self, member: discord.Member) -> bool:
+        return self.has_any_role_id(member, DEV_ROLE_IDS)
+
+
+def get_role_index(bot: discord.Client) -> RoleIndex:
+    """Returns the bot's shared role index, creating it on first use."""
+    index = getattr(bot, "role_index", None)
+    if index is None:
+        index = RoleIndex()
+        bot.role_index = index
+    return index
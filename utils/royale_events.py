@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import time
+
+# Rotate the active segment into the archive once it grows past this size
+SEGMENT_BYTES = 4 * 1024 * 1024
+COMPACT_INTERVAL = 10 * 60
+
+
+class RoyaleEventLog:
+    """Write-ahead JSONL log of knockouts and revives.
+
+    `append` returns only once the event is fsynced, so callers write the
+    log before committing the fight to the stats database. Appends that
+    arrive while a write is in flight are group-committed with the next
+    single fsync. The stats database is the snapshot: it records the last
+    applied sequence number, so `replay` only yields events it is missing.
+    Compaction moves fully applied segments into the archive directory,
+    which keeps a full audit trail of who knocked out whom.
+    """
+
+    def __init__(self, path: str = "data/royale_events.jsonl", archive_dir: str = "data/royale_events"):
+        self.path = path
+        self.archive_dir = archive_dir
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._repair()
+        self.seq = self._last_seq()
+        self._buffer = []  # (line, future)
+        self._file = open(path, "a", encoding="utf-8")
+        # Serializes every write, rotation and close of self._file
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def _repair(self):
+        """Truncates a torn final line left by a crash mid-write."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                print(f"[Royale] Dropped a torn trailing event in {self.path}")
+
+    def _last_seq(self) -> int:
+        last = 0
+        if os.path.exists(self.path):
+            for event in self._read(self.path):
+                last = max(last, event["seq"])
+        if os.path.isdir(self.archive_dir):
+            for name in os.listdir(self.archive_dir):
+                # Archived segments are named <first_seq>-<last_seq>.jsonl
+                try:
+                    last = max(last, int(name.split(".")[0].split("-")[1]))
+                except (IndexError, ValueError):
+                    continue
+        return last
+
+    @staticmethod
+    def _read(path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"[Royale] Skipping corrupt event line in {path}")
+                    continue
+
+    # === Writing ===
+    async def append(self, kind: str, **fields) -> dict:
+        """Stamps and logs an event; returns it once it is durable on disk."""
+        self.seq += 1
+        event = {"seq": self.seq, "ts": round(time.time(), 3), "type": kind, **fields}
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((json.dumps(event, separators=(",", ":")), future))
+        if self._task is None or self._task.done():
+            await self.flush()
+        else:
+            self._wakeup.set()
+        await future
+        return event
+
+    def _write(self, lines):
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def _flush_locked(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, [line for line, _ in batch])
+        except Exception as e:
+            print(f"[Royale] Failed to write {len(batch)} fight events: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        async with self._lock:
+            await self._flush_locked()
+            self._file.close()
+
+    # === Replay / Compaction ===
+    def replay(self, after_seq: int = 0):
+        """Yields logged events with seq > after_seq from the active segment."""
+        if not os.path.exists(self.path):
+            return
+        for event in self._read(self.path):
+            if event["seq"] > after_seq:
+                yield event
+
+    async def compact(self, applied_seq: int, force: bool = False):
+        """Archives the active segment once every event in it is in the snapshot."""
+        async with self._lock:
+            await self._flush_locked()
+            if not force and os.path.getsize(self.path) < SEGMENT_BYTES:
+                return False
+            first = next(self.replay(0), None)
+            if first is None or applied_seq < self.seq:
+                return False
+            self._file.close()
+            os.makedirs(self.archive_dir, exist_ok=True)
+            os.replace(self.path, os.path.join(self.archive_dir, f"{first['seq']}-{self.seq}.jsonl"))
+            self._file = open(self.path, "a", encoding="utf-8")
+            return True
@@ -0,0 +1,105 @@
+import threading
+from bisect import bisect_left, insort
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    class SortedList(list):
+        """Plain sorted list fallback; updates are O(n) instead of O(log n)."""
+
+        def __init__(self, iterable=()):
+            super().__init__(sorted(iterable))
+
+        def add(self, value):
+            insort(self, value)
+
+        def remove(self, value):
+            del self[bisect_left(self, value)]
+
+        def bisect_left(self, value):
+            return bisect_left(self, value)
+
+
+class RankIndex:
+    """Players kept sorted by a score tuple, best first.
+
+    Entries are stored as (negated score..., user_id) so ascending order is
+    leaderboard order, in a sortedcontainers SortedList (a plain sorted list
+    when it isn't installed). Rank lookups and updates are O(log n). A lock
+    guards each update because the stats store runs them from its worker
+    thread.
+    """
+
+    def __init__(self):
+        self.entries = SortedList()
+        self.by_user = {}  # user_id -> entry
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry(user_id: int, score) -> tuple:
+        return tuple(-s for s in score) + (user_id,)
+
+    def update(self, user_id: int, score):
+        entry = self._entry(user_id, score)
+        with self._lock:
+            old = self.by_user.get(user_id)
+            if old == entry:
+                return
+            if old is not None:
+                self.entries.remove(old)
+            self.entries.add(entry)
+            self.by_user[user_id] = entry
+
+    def rebuild(self, scores):
+        """Replaces the index from an iterable of (user_id, score)."""
+        by_user = {user_id: self._entry(user_id, score) for user_id, score in scores}
+        with self._lock:
+            self.by_user = by_user
+            self.entries = SortedList(by_user.values())
+
+    def rank(self, user_id: int):
+        """1-based rank of the user, or None if they have no stats yet."""
+        with self._lock:
+            entry = self.by_user.get(user_id)
+            return self.entries.bisect_left(entry) + 1 if entry is not None else None
+
+    def page(self, offset: int = 0, limit: int = 10):
+        """Returns [(rank, user_id, score)] for one page of the board."""
+        with self._lock:
+            rows = self.entries[offset:offset + limit]
+        return [(offset + i + 1, row[-1], tuple(-s for s in row[:-1])) for i, row in enumerate(rows)]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RoyaleLeaderboard:
+    """Royale rankings by (level, xp) and by kills, maintained incrementally."""
+
+    BOARDS = ("level", "kills")
+
+    def __init__(self):
+        self.boards = {name: RankIndex() for name in self.BOARDS}
+
+    @staticmethod
+    def scores(row: dict) -> dict:
+        return {"level": (row["level"], row["xp"]), "kills": (row["kills"],)}
+
+    def update(self, user_id: int, row: dict):
+        for name, score in self.scores(row).items():
+            self.boards[name].update(user_id, score)
+
+    def rebuild(self, rows):
+        """Rebuilds every board from (user_id, row) pairs."""
+        rows = list(rows)
+        for name in self.BOARDS:
+            self.boards[name].rebuild((user_id, self.scores(row)[name]) for user_id, row in rows)
+
+    def rank(self, board: str, user_id: int):
+        return self.boards[board].rank(user_id)
+
+    def page(self, board: str, offset: int = 0, limit: int = 10):
+        return self.boards[board].page(offset, limit)
+
+    def __len__(self):
+        return len(self.boards["level"])
@@ -0,0 +1,155 @@
+"""Vectorized fight-balance simulator for data/weaponroyal.json.
+
+Draws weapons, outcomes, timeouts and XP with the same compiled tables the
+/waifufights command uses (utils/weapon_sampler.py), just as NumPy arrays:
+
+    python -m utils.royale_sim --fights 10000000
+    python -m utils.royale_sim --json > balance.json
+"""
+import argparse
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("The royale simulator needs numpy: pip install numpy")
+from utils.royale_store import MAX_LEVEL, cost_of_levels
+from utils.weapon_sampler import (
+    CRIT_TIMEOUT_MULTIPLIER, CRIT_XP_RANGE, HIT_XP_RANGE, OUTCOMES, WeaponTable
+)
+
+WEAPON_FILE = "data/weaponroyal.json"
+CONFIG_FILE = "data/royale_config.json"
+CHUNK = 1_000_000
+
+
+def _alias_draw(rng, sampler, size):
+    """Vectorized draw from an AliasSampler's prob/alias tables (indices)."""
+    prob = np.asarray(sampler.prob)
+    alias = np.asarray(sampler.alias)
+    idx = rng.integers(0, len(prob), size=size)
+    keep = rng.random(size) < prob[idx]
+    return np.where(keep, idx, alias[idx])
+
+
+class FightSimulator:
+    """Simulates knockout attempts in bulk from a compiled WeaponTable."""
+
+    def __init__(self, table: WeaponTable, seed: int = None):
+        self.table = table
+        self.rng = np.random.default_rng(seed)
+        self.keys = table.weapon_sampler.items
+        self.multipliers = np.array([table.weapons[k].xp_multiplier for k in self.keys])
+        widest = max(len(table.timeouts[k]) for k in self.keys)
+        self.timeout_counts = np.array([len(table.timeouts[k]) for k in self.keys])
+        self.timeout_table = np.zeros((len(self.keys), widest), dtype=np.int64)
+        for i, k in enumerate(self.keys):
+            self.timeout_table[i, :len(table.timeouts[k])] = table.timeouts[k]
+        outcome_items = table.outcome_sampler.items
+        self.miss = outcome_items.index("miss")
+        self.crit = outcome_items.index("crit")
+
+    def fights(self, n: int):
+        """Returns (weapon_idx, outcome_idx, xp, timeout_seconds) arrays for n attempts."""
+        rng = self.rng
+        weapon = _alias_draw(rng, self.table.weapon_sampler, n)
+        outcome = _alias_draw(rng, self.table.outcome_sampler, n)
+        crit = outcome == self.crit
+        miss = outcome == self.miss
+
+        choice = (rng.random(n) * self.timeout_counts[weapon]).astype(np.int64)
+        timeout = self.timeout_table[weapon, choice] * np.where(crit, CRIT_TIMEOUT_MULTIPLIER, 1)
+
+        roll = np.where(
+            crit,
+            rng.integers(CRIT_XP_RANGE[0], CRIT_XP_RANGE[1] + 1, size=n),
+            rng.integers(HIT_XP_RANGE[0], HIT_XP_RANGE[1] + 1, size=n),
+        )
+        # int() in the command truncates, which is floor for these positive values
+        xp = np.floor(roll * self.multipliers[weapon]).astype(np.int64)
+        xp[miss] = 0
+        timeout[miss] = 0
+        return weapon, outcome, xp, timeout
+
+    def run(self, total: int, cooldown: float):
+        n_weapons = len(self.keys)
+        picks = np.zeros(n_weapons, dtype=np.int64)
+        xp_sum = np.zeros(n_weapons, dtype=np.int64)
+        timeout_sum = np.zeros(n_weapons, dtype=np.int64)
+        outcome_counts = np.zeros(len(OUTCOMES), dtype=np.int64)
+
+        done = 0
+        while done < total:
+            n = min(CHUNK, total - done)
+            weapon, outcome, xp, timeout = self.fights(n)
+            picks += np.bincount(weapon, minlength=n_weapons)
+            xp_sum += np.bincount(weapon, weights=xp, minlength=n_weapons).astype(np.int64)
+            timeout_sum += np.bincount(weapon, weights=timeout, minlength=n_weapons).astype(np.int64)
+            outcome_counts += np.bincount(outcome, minlength=len(OUTCOMES))
+            done += n
+
+        xp_per_fight = xp_sum.sum() / total
+        fights_per_hour = 3600.0 / cooldown
+        xp_per_hour = xp_per_fight * fights_per_hour
+        xp_to_cap = cost_of_levels(1, MAX_LEVEL - 1)
+
+        return {
+            "fights": total,
+            "knockout_cooldown": cooldown,
+            "xp_per_fight": round(float(xp_per_fight), 3),
+            "xp_per_hour": round(float(xp_per_hour), 2),
+            "xp_to_cap": xp_to_cap,
+            "hours_to_cap": round(xp_to_cap / xp_per_hour, 2) if xp_per_hour else None,
+            "outcomes": {
+                name: round(float(outcome_counts[i] / total), 4)
+                for i, name in enumerate(self.table.outcome_sampler.items)
+            },
+            "weapons": {
+                key: {
+                    "pick_rate": round(float(picks[i] / total), 4),
+                    "xp_per_fight": round(float(xp_sum[i] / picks[i]), 3) if picks[i] else 0.0,
+                    "timeout_minutes_per_fight": round(float(timeout_sum[i] / picks[i] / 60), 3) if picks[i] else 0.0,
+                    "timeout_minutes_total": round(float(timeout_sum[i] / 60), 1),
+                }
+                for i, key in enumerate(self.keys)
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate /waifufights balance from weaponroyal.json.")
+    parser.add_argument("--fights", type=int, default=10_000_000)
+    parser.add_argument("--weapons", default=WEAPON_FILE)
+    parser.add_argument("--cooldown", type=float, default=None, help="Knockout cooldown in seconds (default: royale_config.json)")
+    parser.add_argument("--booster", action="store_true", help="Apply the 30%% booster cooldown discount")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    cooldown = args.cooldown
+    if cooldown is None:
+        with open(CONFIG_FILE, "r") as f:
+            cooldown = float(json.load(f).get("knockout_cooldown", 900))
+    if args.booster:
+        cooldown *= 0.7
+
+    started = time.perf_counter()
+    report = FightSimulator(WeaponTable(args.weapons), seed=args.seed).run(args.fights, cooldown)
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return
+
+    print(f"Simulated {report['fights']:,} fights in {report['elapsed_seconds']}s (cooldown {cooldown:.0f}s)")
+    print(f"XP/fight: {report['xp_per_fight']}  XP/hour: {report['xp_per_hour']}  "
+          f"Level {MAX_LEVEL} ({report['xp_to_cap']} XP) in {report['hours_to_cap']}h")
+    print("Outcomes: " + ", ".join(f"{k} {v:.2%}" for k, v in report["outcomes"].items()))
+    print(f"{'weapon':<14}{'pick':>8}{'xp/fight':>10}{'tmin/fight':>12}{'tmin total':>14}")
+    for key, w in report["weapons"].items():
+        print(f"{key:<14}{w['pick_rate']:>8.2%}{w['xp_per_fight']:>10}{w['timeout_minutes_per_fight']:>12}{w['timeout_minutes_total']:>14}")
+
+
+if __name__ == "__main__":
+    main()
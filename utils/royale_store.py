@@ -0,0 +1,301 @@
+import json
+import math
+import os
+from utils.royale_leaderboard import RoyaleLeaderboard
+from utils.sqlite_worker import SQLiteWorker
+
+MAX_LEVEL = 15
+
+STAT_FIELDS = ("kills", "deaths", "revives", "failed_revives", "xp", "level", "prestige")
+DEFAULT_USER = {
+    "kills": 0, "deaths": 0, "revives": 0, "failed_revives": 0,
+    "xp": 0, "level": 1, "prestige": 0
+}
+
+
+def xp_needed(level: int) -> int:
+    return 100 + (level * 25)
+
+
+def levels_affordable(level: int, xp: int) -> int:
+    """How many levels `xp` buys starting at `level`, ignoring the cap.
+
+    Advancing k levels costs k*(100 + 25*level) + 25*k*(k-1)/2, so k is the
+    largest root of 25k^2 + (175 + 50*level)k - 2*xp <= 0.
+    """
+    if xp < xp_needed(level):
+        return 0
+    b = 175 + 50 * level
+    k = (math.isqrt(b * b + 200 * xp) - b) // 50
+    # isqrt floors, so nudge k onto the exact boundary
+    while cost_of_levels(level, k + 1) <= xp:
+        k += 1
+    while k > 0 and cost_of_levels(level, k) > xp:
+        k -= 1
+    return k
+
+
+def cost_of_levels(level: int, k: int) -> int:
+    """Total XP needed to go from `level` to `level + k`."""
+    return k * xp_needed(level) + 25 * k * (k - 1) // 2
+
+
+def apply_xp(level: int, xp: int, amount: int):
+    """Applies an XP grant to (level, xp) in O(1) and returns (level, xp, leveled_up).
+
+    At MAX_LEVEL, leftover XP keeps accumulating instead of being spent on
+    further (clamped) level-ups. Negative grants never drop below 0 XP.
+    """
+    xp = max(0, xp + amount)
+    k = min(levels_affordable(level, xp), max(0, MAX_LEVEL - level))
+    if k == 0:
+        return level, xp, False
+    return level + k, xp - cost_of_levels(level, k), True
+
+
+class RoyaleStatsStore(SQLiteWorker):
+    """SQLite store for royale player stats.
+
+    Runs on its own worker thread (see SQLiteWorker). Each public call runs
+    in one transaction, so a knockout's kill, death and XP updates commit
+    together.
+
+    `leaderboard` mirrors the rows in memory, ordered by (level, xp) and by
+    kills. It is loaded once on open and updated after each commit.
+
+    The database doubles as the snapshot of the royale event log: fights
+    recorded with a `seq` store it in `meta.last_seq` in the same
+    transaction, so replaying the log on startup applies each event once.
+    """
+
+    def __init__(self, path: str = "data/royal_stats.db", legacy_json: str = "data/royal_stats.json"):
+        super().__init__(path, thread_name="royale-store")
+        self.legacy_json = legacy_json
+        self.leaderboard = RoyaleLeaderboard()
+        self.applied_seq = 0
+
+    # === Schema ===
+    def _setup(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS players ("
+            "user_id INTEGER PRIMARY KEY, "
+            "kills INTEGER NOT NULL DEFAULT 0, deaths INTEGER NOT NULL DEFAULT 0, "
+            "revives INTEGER NOT NULL DEFAULT 0, failed_revives INTEGER NOT NULL DEFAULT 0, "
+            "xp INTEGER NOT NULL DEFAULT 0, level INTEGER NOT NULL DEFAULT 1, "
+            "prestige INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS players_level_xp ON players (level DESC, xp DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS players_kills ON players (kills DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS players_xp ON players (xp DESC)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_seq'").fetchone()
+        self.applied_seq = row["value"] if row else 0
+        self._migrate_json()
+        self.leaderboard.rebuild(
+            (row["user_id"], row) for row in conn.execute("SELECT user_id, level, xp, kills FROM players")
+        )
+
+    def _migrate_json(self):
+        """One-time import of the old royal_stats.json into the database."""
+        if not os.path.exists(self.legacy_json):
+            return
+        with open(self.legacy_json, "r") as f:
+            legacy = json.load(f)
+        rows = []
+        for user_id, user in legacy.items():
+            merged = {**DEFAULT_USER, **user}
+            rows.append((int(user_id), *(int(merged[k]) for k in STAT_FIELDS)))
+        with self._transaction() as conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO players (user_id, {', '.join(STAT_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in STAT_FIELDS)})",
+                rows,
+            )
+        os.replace(self.legacy_json, self.legacy_json + ".migrated")
+        print(f"[Royale] Migrated {len(rows)} players from {self.legacy_json}")
+
+    def _get_row(self, conn, user_id: int) -> dict:
+        row = conn.execute("SELECT * FROM players WHERE user_id = ?", (int(user_id),)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO players (user_id) VALUES (?)", (int(user_id),))
+            return {**DEFAULT_USER}
+        return {k: row[k] for k in STAT_FIELDS}
+
+    def _add_xp(self, conn, user_id: int, amount: int):
+        user = self._get_row(conn, user_id)
+        level, xp, leveled_up = apply_xp(user["level"], user["xp"], amount)
+        conn.execute("UPDATE players SET level = ?, xp = ? WHERE user_id = ?", (level, xp, int(user_id)))
+        return leveled_up, level
+
+    def _reindex(self, conn, user_ids):
+        """Pushes the committed rows for `user_ids` into the leaderboard."""
+        ids = [int(u) for u in user_ids]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for row in conn.execute(
+                f"SELECT user_id, level, xp, kills FROM players WHERE user_id IN ({', '.join('?' for _ in chunk)})", chunk
+            ):
+                self.leaderboard.update(row["user_id"], row)
+
+    def _mark_applied(self, conn, seq):
+        if seq is None:
+            return
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_seq', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)",
+            (seq,),
+        )
+
+    def _increment(self, conn, user_id: int, field: str):
+        self._get_row(conn, user_id)
+        conn.execute(f"UPDATE players SET {field} = {field} + 1 WHERE user_id = ?", (int(user_id),))
+
+    # === Blocking API (runs on the store thread) ===
+    def get_user_sync(self, user_id: int) -> dict:
+        conn = self._connect()
+        with self._transaction():
+            return self._get_row(conn, user_id)
+
+    def add_xp_sync(self, user_id: int, amount: int):
+        conn = self._connect()
+        with self._transaction():
+            result = self._add_xp(conn, user_id, amount)
+        self._reindex(conn, [user_id])
+        return result
+
+    def add_xp_batch_sync(self, grants):
+        """Applies many (user_id, xp) grants in a single transaction.
+
+        Grants are applied one by one in the given order, since XP clamps at
+        0 and levels never go down (a -50 then +100 is not a +50). Returns
+        {user_id: (leveled_up, level)}.
+        """
+        grants = [(int(user_id), int(amount)) for user_id, amount in grants]
+        conn = self._connect()
+        with self._transaction():
+            ids = list(dict.fromkeys(user_id for user_id, _ in grants))
+            state = dict.fromkeys(ids, (DEFAULT_USER["level"], DEFAULT_USER["xp"]))
+            # Chunk the IN clause to stay under SQLite's variable limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                for row in conn.execute(
+                    f"SELECT user_id, level, xp FROM players WHERE user_id IN ({', '.join('?' for _ in chunk)})", chunk
+                ):
+                    state[row["user_id"]] = (row["level"], row["xp"])
+            start = {user_id: level for user_id, (level, _) in state.items()}
+            for user_id, amount in grants:
+                level, xp, _ = apply_xp(*state[user_id], amount)
+                state[user_id] = (level, xp)
+            conn.executemany(
+                "INSERT INTO players (user_id, level, xp) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET level = excluded.level, xp = excluded.xp",
+                [(user_id, *state[user_id]) for user_id in ids],
+            )
+        self._reindex(conn, ids)
+        return {user_id: (state[user_id][0] > start[user_id], state[user_id][0]) for user_id in ids}
+
+    def record_knockout_sync(self, attacker_id: int, victim_id: int, xp_gain: int = 0, seq: int = None):
+        conn = self._connect()
+        with self._transaction():
+            self._mark_applied(conn, seq)
+            self._increment(conn, attacker_id, "kills")
+            self._increment(conn, victim_id, "deaths")
+            if xp_gain:
+                result = self._add_xp(conn, attacker_id, xp_gain)
+            else:
+                result = False, self._get_row(conn, attacker_id)["level"]
+        self._reindex(conn, [attacker_id, victim_id])
+        if seq is not None:
+            self.applied_seq = max(self.applied_seq, seq)
+        return result
+
+    def record_revive_sync(self, user_id: int, success: bool, xp_gain: int = 0, seq: int = None):
+        conn = self._connect()
+        with self._transaction():
+            self._mark_applied(conn, seq)
+            self._increment(conn, user_id, "revives" if success else "failed_revives")
+            if success and xp_gain:
+                result = self._add_xp(conn, user_id, xp_gain)
+            else:
+                result = False, self._get_row(conn, user_id)["level"]
+        self._reindex(conn, [user_id])
+        if seq is not None:
+            self.applied_seq = max(self.applied_seq, seq)
+        return result
+
+    def replay_sync(self, events) -> int:
+        """Applies logged events newer than the snapshot; returns how many were applied."""
+        self._connect()
+        applied = 0
+        for event in events:
+            if event["seq"] <= self.applied_seq:
+                continue
+            if event["type"] == "knockout":
+                self.record_knockout_sync(event["attacker"], event["victim"], event.get("xp", 0), event["seq"])
+            elif event["type"] == "revive":
+                self.record_revive_sync(event["user"], event["success"], event.get("xp", 0), event["seq"])
+            applied += 1
+        return applied
+
+    def checkpoint_sync(self):
+        """Folds the WAL back into the main database file."""
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def top_sync(self, order: str = "level", limit: int = 10, offset: int = 0):
+        order_by = {
+            "level": "level DESC, xp DESC",
+            "kills": "kills DESC",
+            "xp": "xp DESC",
+        }[order]
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT * FROM players ORDER BY {order_by} LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [{"user_id": row["user_id"], **{k: row[k] for k in STAT_FIELDS}} for row in rows]
+
+    def get_users_sync(self, user_ids) -> dict:
+        """Returns {user_id: stats} for existing players (read-only)."""
+        conn = self._connect()
+        ids = [int(u) for u in user_ids]
+        if not ids:
+            return {}
+        rows = conn.execute(
+            f"SELECT * FROM players WHERE user_id IN ({', '.join('?' for _ in ids)})", ids
+        ).fetchall()
+        return {row["user_id"]: {k: row[k] for k in STAT_FIELDS} for row in rows}
+
+    # === Async API ===
+    async def open(self):
+        await self._run(self._connect)
+
+    async def get_user(self, user_id: int) -> dict:
+        return await self._run(self.get_user_sync, user_id)
+
+    async def add_xp(self, user_id: int, amount: int):
+        return await self._run(self.add_xp_sync, user_id, amount)
+
+    async def add_xp_batch(self, grants):
+        """Applies many (user_id, xp) grants with one commit; see add_xp_batch_sync."""
+        return await self._run(self.add_xp_batch_sync, list(grants))
+
+    async def record_knockout(self, attacker_id: int, victim_id: int, xp_gain: int = 0, seq: int = None):
+        """Commits the attacker's kill, the victim's death and any XP in one transaction.
+
+        Returns (leveled_up, attacker_level).
+        """
+        return await self._run(self.record_knockout_sync, attacker_id, victim_id, xp_gain, seq)
+
+    async def record_revive(self, user_id: int, success: bool, xp_gain: int = 0, seq: int = None):
+        return await self._run(self.record_revive_sync, user_id, success, xp_gain, seq)
+
+    async def replay(self, events) -> int:
+        return await self._run(self.replay_sync, list(events))
+
+    async def checkpoint(self):
+        await self._run(self.checkpoint_sync)
+
+    async def top(self, order: str = "level", limit: int = 10, offset: int = 0):
+        return await self._run(self.top_sync, order, limit, offset)
+
+    async def get_users(self, user_ids) -> dict:
+        return await self._run(self.get_users_sync, list(user_ids))
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class SQLiteWorker:
+    """Base for stores whose SQLite (WAL) connection lives on one worker thread.
+
+    The connection is opened lazily on the worker and only ever used there;
+    the async API hands work over with `_run`, so a write waiting on another
+    process's lock never blocks the event loop. Subclasses create their
+    schema in `_setup` and write through `_transaction`.
+    """
+
+    def __init__(self, path: str, thread_name: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name)
+        self._conn = None
+
+    # === Worker thread only ===
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn = conn
+        self._setup(conn)
+        return conn
+
+    def _setup(self, conn: sqlite3.Connection):
+        """Creates tables and loads any in-memory state; runs once per connection."""
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front so other processes can't interleave
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # === Async API ===
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def close(self):
+        await self._run(self.close_sync)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class StatsCache:
+    """Bounded LRU cache with a TTL, stale-while-revalidate and singleflight.
+
+    - fresh (younger than `ttl`): served from memory.
+    - stale (younger than `ttl + stale_ttl`): served from memory while one
+      background refresh fetches a new value.
+    - missing or expired: fetched; concurrent callers for the same key await
+      the same in-flight task instead of issuing their own request.
+
+    A loader returning None (not found / API error) is never cached, and a
+    failed refresh keeps serving the stale value until it expires.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0, stale_ttl: float = 240.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()  # key -> (value, fetched_at)
+        self.inflight = {}  # key -> asyncio.Task
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    def _store(self, key, value):
+        self.entries[key] = (value, time.monotonic())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _fetch(self, key, loader) -> asyncio.Task:
+        task = self.inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+            return task
+
+        async def run():
+            try:
+                value = await loader()
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            finally:
+                self.inflight.pop(key, None)
+            if value is not None:
+                self._store(key, value)
+            return value
+
+        task = self.inflight[key] = asyncio.get_running_loop().create_task(run())
+        return task
+
+    async def get(self, key, loader):
+        """Returns the cached value for `key`, calling `loader()` when it must be fetched."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                self.entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                self.entries.move_to_end(key)
+                if key not in self.inflight:
+                    self.counters["refreshes"] += 1
+                    # Retrieve the exception so a failed refresh isn't reported as unhandled
+                    self._fetch(key, loader).add_done_callback(lambda t: t.cancelled() or t.exception())
+                return value
+            del self.entries[key]
+
+        if key not in self.inflight:
+            self.counters["misses"] += 1
+        # shield: one caller timing out must not cancel the fetch the others share
+        return await asyncio.shield(self._fetch(key, loader))
+
+    def invalidate(self, key):
+        self.entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"] + self.counters["coalesced"]
+        served = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "size": len(self.entries),
+            "inflight": len(self.inflight),
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+        }
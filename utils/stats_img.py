@@ -1,6 +1,8 @@
 import io
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
+from utils.models import PlayerStats
 
 # --- Level progression ---
 LEVEL_PROGRESSION = {1:0,2:4000,3:8000,4:10000,5:13200,6:26400,7:52800,8:16000,9:18000,10:20000,
@@ -19,6 +21,24 @@ LEVEL_PROGRESSION = {1:0,2:4000,3:8000,4:10000,5:13200,6:26400,7:52800,8:16000,9
     100:200000
 }
 
+# ---- Anime colors ----
+THEMES = {
+    "default": {
+        "bg": (35, 31, 32),            # #231f20
+        "accent": (217, 254, 0),       # #d9fe00
+        "secondary": (145, 180, 240),  # #91b4f0
+        "text": (235, 235, 235),
+        "muted": (160, 160, 160),
+        "card": (50, 46, 48),          # slightly lighter than bg
+        "bar_bg": (80, 70, 72),        # bar background
+    },
+}
+
+AVATAR_PATH = "animegirl.png"
+# zlib level for the PNG; encoding dominates render time once the static layer is cached
+PNG_COMPRESS_LEVEL = 1
+
+@lru_cache(maxsize=None)
 def load_font(size=20):
     try:
         return ImageFont.truetype("arial.ttf", size)
@@ -38,137 +58,111 @@ def get_progress(level: int, xp: int):
     progress = max(0.0, min(1.0, xp_into_level / xp_needed))
     return progress, f"{xp_into_level} / {xp_needed}", xp_into_level, xp_needed
 
-def generate_stats_image(data: dict, width=900, height=520) -> io.BytesIO:
-    W, H = width, height
-
-    # ---- Anime colors ----
-    color_bg = (35, 31, 32)           # #231f20
-    color_accent = (217, 254, 0)      # #d9fe00
-    color_secondary = (145, 180, 240) # #91b4f0
-    color_text = (235, 235, 235)
-    color_muted = (160, 160, 160)
-    color_card = (50, 46, 48)         # slightly lighter than bg
-    color_bar_bg = (80, 70, 72)       # bar background
-
-    img = Image.new("RGB", (W, H), color_bg)
-    draw = ImageDraw.Draw(img)
-
-    font_title = load_font(46)
-    font_level = load_font(44)
-    font_big = load_font(28)
-    font_label = load_font(20)
-
+def _layout(W: int, H: int) -> dict:
     padding = 30
-    draw.text((padding, padding), "Waifu Tactical Force", fill=color_accent, font=font_title)
+    card_x, card_y = padding, 120
+    card_w, card_h = W - padding*2, H - card_y - padding
+    level_x, level_y = card_x + 25, card_y + 20
+    bar_y = level_y + 64
+    return {
+        "padding": padding,
+        "card": (card_x, card_y, card_w, card_h),
+        "level": (level_x, level_y),
+        "bar": (level_x, bar_y, card_w - 150, 28),
+        "left": (level_x, bar_y + 80),
+        "right": (card_x + card_w//2 + 10, bar_y + 80),
+        "line_h": 36,
+        "footer_y": card_y + card_h - 25,
+    }
+
+@lru_cache(maxsize=8)
+def _static_layer(W: int, H: int, theme: str) -> Image.Image:
+    """Everything that doesn't depend on the player, rendered once per size/theme."""
+    colors = THEMES[theme]
+    layout = _layout(W, H)
+    padding = layout["padding"]
+
+    img = Image.new("RGB", (W, H), colors["bg"])
+    draw = ImageDraw.Draw(img)
+    draw.text((padding, padding), "Waifu Tactical Force", fill=colors["accent"], font=load_font(46))
 
     # ---- Circular avatar ----
     circle_size = 120
     circle_x = W - 170
     circle_y = padding
-    avatar_box = (circle_x, circle_y, circle_x + circle_size, circle_y + circle_size)
-
-    # Draw background circle
-    draw.ellipse(avatar_box, fill=color_secondary)  # nice background behind avatar
-
-    avatar_path = "animegirl.png"
+    draw.ellipse((circle_x, circle_y, circle_x + circle_size, circle_y + circle_size), fill=colors["secondary"])
     try:
-        avatar = Image.open(avatar_path).convert("RGBA").resize((circle_size, circle_size))
-        
-        # Create circular mask
+        avatar = Image.open(AVATAR_PATH).convert("RGBA").resize((circle_size, circle_size))
         mask = Image.new("L", (circle_size, circle_size), 0)
         ImageDraw.Draw(mask).ellipse((0, 0, circle_size, circle_size), fill=255)
-        
-        # Create transparent avatar circle
         avatar_circle = Image.new("RGBA", (circle_size, circle_size), (0, 0, 0, 0))
         avatar_circle.paste(avatar, (0, 0), mask=mask)
-        
-        # Paste onto main image using alpha
         img.paste(avatar_circle, (circle_x, circle_y), avatar_circle)
     except:
-        draw.text((circle_x + 15, circle_y + 40), "NO IMG", fill=color_muted, font=font_label)
+        draw.text((circle_x + 15, circle_y + 40), "NO IMG", fill=colors["muted"], font=load_font(20))
 
     # ---- Card background ----
-    card_x = padding
-    card_y = 120
-    card_w = W - padding*2
-    card_h = H - card_y - padding
-    draw.rectangle([card_x, card_y, card_x+card_w, card_y+card_h], fill=color_card)
-
-    # ---- Level and Rounded XP Bar ----
-    level = int(data.get("Level", 0))
-    xp = int(data.get("TotalXP", 0))
-    progress, prog_text, _, _ = get_progress(level, xp)
-    level_label = "MAX LEVEL" if level >= 100 else f"Level {level}"
-    level_x = card_x + 25
-    level_y = card_y + 20
-    draw.text((level_x, level_y), level_label, fill=color_accent, font=font_level)
+    card_x, card_y, card_w, card_h = layout["card"]
+    draw.rectangle([card_x, card_y, card_x+card_w, card_y+card_h], fill=colors["card"])
 
-    # Rounded/pill-style bar parameters
-    bar_x = level_x
-    bar_y = level_y + 64
-    bar_w = card_w - 150
-    bar_h = 28
-    radius = bar_h // 2
+    # ---- XP bar background (full width) ----
+    bar_x, bar_y, bar_w, bar_h = layout["bar"]
+    draw.rounded_rectangle([bar_x, bar_y, bar_x + bar_w, bar_y + bar_h], radius=bar_h // 2, fill=colors["bar_bg"])
 
-    # Draw background bar (full width)
-    draw.rounded_rectangle([bar_x, bar_y, bar_x + bar_w, bar_y + bar_h], radius=radius, fill=color_bar_bg)
+    draw.text((W - 300, layout["footer_y"]), "WTF Game — Player Stats", fill=colors["muted"], font=load_font(20))
+    return img
 
-    # Draw filled portion
-    fill_w = int(bar_w * progress)
-    draw.rounded_rectangle([bar_x, bar_y, bar_x + fill_w, bar_y + bar_h], radius=radius, fill=color_secondary)
+def generate_stats_image(stats: PlayerStats, width=900, height=520, theme: str = "default") -> io.BytesIO:
+    """Renders a player's stat card on a copy of the cached static layer."""
+    W, H = width, height
+    colors = THEMES[theme]
+    layout = _layout(W, H)
+    img = _static_layer(W, H, theme).copy()
+    draw = ImageDraw.Draw(img)
 
-    # XP text inside or below the bar
-    xp_text = "XP: MAX" if level >= 100 else f"XP: {prog_text} ({int(progress*100)}%)"
-    draw.text((bar_x, bar_y + bar_h + 6), xp_text, fill=color_text, font=font_label)
+    font_level = load_font(44)
+    font_big = load_font(28)
+    font_label = load_font(20)
 
+    # ---- Level and XP bar fill ----
+    level = stats.level
+    progress, prog_text, _, _ = get_progress(level, stats.xp)
+    level_label = "MAX LEVEL" if level >= 100 else f"Level {level}"
+    draw.text(layout["level"], level_label, fill=colors["accent"], font=font_level)
 
+    bar_x, bar_y, bar_w, bar_h = layout["bar"]
+    fill_w = int(bar_w * progress)
+    draw.rounded_rectangle([bar_x, bar_y, bar_x + fill_w, bar_y + bar_h], radius=bar_h // 2, fill=colors["secondary"])
+    xp_text = "XP: MAX" if level >= 100 else f"XP: {prog_text} ({int(progress*100)}%)"
+    draw.text((bar_x, bar_y + bar_h + 6), xp_text, fill=colors["text"], font=font_label)
 
     # ---- Stats ----
-    left_x = level_x
-    left_y = bar_y + 80
-    line_h = 36
-    kills = int(data.get("TotalKills",0))
-    deaths = int(data.get("TotalDeaths",0))
-    assists = int(data.get("TotalAssists",0))
-    total_shots = int(data.get("TotalShotsFired",0))
-    hit_shots = int(data.get("TotalShotsHit",0))
-    accuracy = round((hit_shots / total_shots) * 100, 1) if total_shots>0 else 0
-    kd = round(kills/deaths,2) if deaths>0 else float(kills)
-
-    draw.text((left_x, left_y), f"Kills: {kills}", fill=color_text, font=font_big)
-    draw.text((left_x, left_y+line_h), f"Deaths: {deaths}", fill=color_text, font=font_big)
-    draw.text((left_x, left_y+line_h*2), f"Assists: {assists}", fill=color_text, font=font_big)
-    draw.text((left_x, left_y+line_h*3), f"K/D: {kd}", fill=color_text, font=font_big)
-    draw.text((left_x, left_y+line_h*4), f"Accuracy: {accuracy}%", fill=color_text, font=font_big)
-
-    right_x = card_x + card_w//2 + 10
-    right_y = left_y
-    matches = int(data.get("TotalMatches",0))
-    wins = int(data.get("MatchesWon",0))
-    losses = int(data.get("MatchesLost",0))
-    dmg_dealt = int(data.get("TotalDamageDealt",0))
-    dmg_taken = int(data.get("TotalDamageTaken",0))
-    score = int(data.get("TotalScore",0))
-
-    draw.text((right_x, right_y), f"Matches: {matches}", fill=color_text, font=font_big)
-    draw.text((right_x, right_y+line_h), f"W/L: {wins}/{losses}", fill=color_text, font=font_big)
-    draw.text((right_x, right_y+line_h*2), f"Damage Dealt: {dmg_dealt}", fill=color_text, font=font_big)
-    draw.text((right_x, right_y+line_h*3), f"Damage Taken: {dmg_taken}", fill=color_text, font=font_big)
-    draw.text((right_x, right_y+line_h*4), f"Score: {score}", fill=color_text, font=font_big)
+    line_h = layout["line_h"]
+    left_x, left_y = layout["left"]
+    draw.text((left_x, left_y), f"Kills: {stats.kills}", fill=colors["text"], font=font_big)
+    draw.text((left_x, left_y+line_h), f"Deaths: {stats.deaths}", fill=colors["text"], font=font_big)
+    draw.text((left_x, left_y+line_h*2), f"Assists: {stats.assists}", fill=colors["text"], font=font_big)
+    draw.text((left_x, left_y+line_h*3), f"K/D: {stats.kd}", fill=colors["text"], font=font_big)
+    draw.text((left_x, left_y+line_h*4), f"Accuracy: {stats.accuracy}%", fill=colors["text"], font=font_big)
+
+    right_x, right_y = layout["right"]
+    draw.text((right_x, right_y), f"Matches: {stats.matches}", fill=colors["text"], font=font_big)
+    draw.text((right_x, right_y+line_h), f"W/L: {stats.wins}/{stats.losses}", fill=colors["text"], font=font_big)
+    draw.text((right_x, right_y+line_h*2), f"Damage Dealt: {stats.damage_dealt}", fill=colors["text"], font=font_big)
+    draw.text((right_x, right_y+line_h*3), f"Damage Taken: {stats.damage_taken}", fill=colors["text"], font=font_big)
+    draw.text((right_x, right_y+line_h*4), f"Score: {stats.score}", fill=colors["text"], font=font_big)
 
     # ---- Footer ----
-    footer_y = card_y + card_h - 25
-    updated_raw = data.get("LastUpdated","Unknown")
+    updated_raw = stats.last_updated
     try:
         dt = datetime.fromisoformat(updated_raw)
         updated = dt.strftime("%b %d, %Y %H:%M")
     except:
         updated = updated_raw
-
-    draw.text((card_x + 25, footer_y), f"Last Updated: {updated}", fill=color_muted, font=font_label)
-    draw.text((W - 300, footer_y), "WTF Game — Player Stats", fill=color_muted, font=font_label)
+    card_x = layout["card"][0]
+    draw.text((card_x + 25, layout["footer_y"]), f"Last Updated: {updated}", fill=colors["muted"], font=font_label)
 
     buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
+    img.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
     buffer.seek(0)
     return buffer
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import discord
+
+# Keep at most this many members per guild, newest first out last
+MAX_PER_GUILD = 512
+# Forget an actor after this long; older audit data is re-read over REST
+ACTOR_TTL = 6 * 60 * 60
+
+
+def is_timeout_change(entry: discord.AuditLogEntry) -> bool:
+    """True if a member_update audit entry touched the member's timeout."""
+    after = getattr(entry, "after", None)
+    for attr in ("timed_out_until", "communication_disabled_until"):
+        if after is not None and hasattr(after, attr):
+            return True
+
+    # entry.changes can be iterable in some discord.py versions, but may not be in others.
+    changes: Any = entry.changes
+    if isinstance(changes, (list, tuple)):
+        for change in changes:
+            attr = getattr(change, 'attribute', None) or getattr(change, 'key', None)
+            if attr in ('timed_out_until', 'communication_disabled_until'):
+                return True
+
+    # Fallback: inspect string representation for the attribute name
+    try:
+        return 'communication_disabled_until' in str(changes) or 'timed_out_until' in str(changes)
+    except Exception:
+        return False
+
+
+class TimeoutActorCache:
+    """Bounded, TTL'd per-guild map of member id -> who last changed their timeout.
+
+    Fed from `on_audit_log_entry_create`, so revive checks can usually be
+    answered without an audit-log REST call.
+    """
+
+    def __init__(self, max_per_guild: int = MAX_PER_GUILD, ttl: float = ACTOR_TTL):
+        self.max_per_guild = max_per_guild
+        self.ttl = ttl
+        self.guilds = {}  # guild_id -> OrderedDict[member_id, (actor, recorded_at)]
+
+    def record(self, guild_id: int, member_id: int, actor: discord.abc.Snowflake):
+        members = self.guilds.setdefault(guild_id, OrderedDict())
+        members[member_id] = (actor, time.monotonic())
+        members.move_to_end(member_id)
+        while len(members) > self.max_per_guild:
+            members.popitem(last=False)
+
+    def record_entry(self, entry: discord.AuditLogEntry) -> bool:
+        if entry.action != discord.AuditLogAction.member_update or not is_timeout_change(entry):
+            return False
+        target_id = getattr(entry.target, "id", None)
+        if target_id is None or entry.user_id is None:
+            return False
+        self.record(entry.guild.id, target_id, entry.user or discord.Object(id=entry.user_id))
+        return True
+
+    def get(self, guild_id: int, member_id: int) -> Optional[discord.abc.Snowflake]:
+        members = self.guilds.get(guild_id)
+        if not members:
+            return None
+        cached = members.get(member_id)
+        if cached is None:
+            return None
+        actor, recorded_at = cached
+        if time.monotonic() - recorded_at > self.ttl:
+            del members[member_id]
+            return None
+        return actor
+
+    def forget_guild(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
@@ -0,0 +1,93 @@
+import os
+import random
+from utils.models import RoyaleWeapon
+
+# Weapons never picked at runtime, whatever their weight
+EXCLUDED_WEAPONS = {"nuke"}
+
+OUTCOMES = ("hit", "miss", "crit")
+OUTCOME_WEIGHTS = (0.7, 0.15, 0.15)
+
+# Inclusive XP roll ranges before the weapon's xp_multiplier is applied
+HIT_XP_RANGE = (10, 25)
+CRIT_XP_RANGE = (20, 35)
+CRIT_TIMEOUT_MULTIPLIER = 2
+
+
+class AliasSampler:
+    """Walker/Vose alias table: O(n) build, O(1) weighted draws."""
+
+    def __init__(self, items, weights):
+        if not items:
+            raise ValueError("AliasSampler needs at least one item")
+        n = len(items)
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("AliasSampler weights must sum to a positive value")
+        self.items = list(items)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+
+class WeaponTable:
+    """weaponroyal.json compiled into O(1) samplers, rebuilt when the file changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = None
+        self.weapons = {}
+        self.weapon_sampler = None
+        self.timeouts = {}
+        self.outcome_sampler = AliasSampler(OUTCOMES, OUTCOME_WEIGHTS)
+        self.reload()
+
+    def reload(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Weapon file missing: {self.path}")
+        mtime = os.stat(self.path).st_mtime_ns
+        weapons = RoyaleWeapon.load(self.path)
+
+        keys = [k for k, w in weapons.items() if k not in EXCLUDED_WEAPONS and w.weight > 0]
+        # Build everything first so a bad file leaves the current table untouched
+        weapon_sampler = AliasSampler(keys, [weapons[k].weight for k in keys])
+        timeouts = {k: w.timeouts for k, w in weapons.items()}
+        self.weapons, self.weapon_sampler, self.timeouts, self.mtime = weapons, weapon_sampler, timeouts, mtime
+
+    def refresh(self):
+        """Recompiles if the weapon file changed on disk since the last build."""
+        try:
+            if os.stat(self.path).st_mtime_ns != self.mtime:
+                self.reload()
+        except Exception as e:
+            print(f"[Royale] Keeping previous weapon table, reload failed: {type(e).__name__}: {e}")
+
+    def pick_weapon(self, rng=random):
+        key = self.weapon_sampler.sample(rng)
+        return key, self.weapons[key]
+
+    def pick_timeout(self, weapon_key: str, rng=random) -> int:
+        choices = self.timeouts[weapon_key]
+        return choices[int(rng.random() * len(choices))]
+
+    def pick_outcome(self, rng=random) -> str:
+        return self.outcome_sampler.sample(rng)
+
+    def roll_xp(self, weapon: RoyaleWeapon, crit: bool, rng=random) -> int:
+        low, high = CRIT_XP_RANGE if crit else HIT_XP_RANGE
+        return int(rng.randint(low, high) * weapon.xp_multiplier)